@@ -7,10 +7,14 @@ from controllers.auth_controller import auth_controller
 from controllers.physical_dev_controller import physical_bp as physical_controller
 from controllers.conditional_dev_controller import conditional_bp as conditional_controller
 from controllers.endurance_dev_controller import endurance_bp as endurance_controller
+from utils import database, json_provider
+from utils.database import create_tables
 
 load_dotenv()
 
 app = Flask(__name__, static_folder='static')
+database.init_app(app)
+json_provider.init_app(app)
 
 
 CORS(app, resources={
@@ -43,6 +47,12 @@ def serve_conditional_graph(filename):
 def serve_endurance_graph(filename):
     return send_from_directory(os.path.join('static', 'graphs', 'endurance_graphs'), filename)
 
+@app.cli.command('create-tables')
+def create_tables_command():
+    """Create the database schema (run once per deploy, never on requests)."""
+    create_tables()
+    print("Database tables created.")
+
 @app.route('/api')
 def api_info():
     return jsonify({
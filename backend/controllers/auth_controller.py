@@ -1,9 +1,9 @@
 from flask import Blueprint, request, jsonify
 from services.auth_service import AuthService
+from utils.database import get_session
 from middlewares.auth_middleware import token_required
 
 auth_controller = Blueprint('auth', __name__)
-auth_service = AuthService()
 
 @auth_controller.route('/login', methods=['POST'])
 def login():
@@ -17,6 +17,7 @@ def login():
     if not data.get('username') or not data.get('password'):
         return jsonify({"message": "Missing username or password"}), 400
     
+    auth_service = AuthService(get_session())
     user, message = auth_service.login_user(data.get('username'), data.get('password'))
     
     if not user:
@@ -39,6 +40,7 @@ def register():
     if not data.get('username') or not data.get('email') or not data.get('password'):
         return jsonify({"message": "Missing required fields"}), 400
     
+    auth_service = AuthService(get_session())
     user, message = auth_service.register_user(
         username=data.get('username'),
         email=data.get('email'),
@@ -66,6 +68,7 @@ def register():
 def get_profile():
     """Get user profile information"""
     user_id = request.user_id
+    auth_service = AuthService(get_session())
     user = auth_service.get_user_by_id(user_id)
     
     if not user:
@@ -81,6 +84,7 @@ def get_profile():
 def get_profile_with_team():
     """Get user profile information with team details including logo"""
     user_id = request.user_id
+    auth_service = AuthService(get_session())
     user = auth_service.get_user_with_team_info(user_id)
     
     if not user:
@@ -101,6 +105,7 @@ def update_profile():
     user_id = request.user_id
     data = request.get_json()
     
+    auth_service = AuthService(get_session())
     user, message = auth_service.update_user(user_id, data)
     
     if not user:
@@ -116,6 +121,7 @@ def update_profile():
 def logout():
     """Handle user logout"""
     user_id = request.user_id
+    auth_service = AuthService(get_session())
     if auth_service.logout_user(user_id):
         return jsonify({"message": "Logged out successfully"}), 200
     
@@ -126,6 +132,7 @@ def logout():
 def verify_token():
     """Verify if the token is valid"""
     user_id = request.user_id
+    auth_service = AuthService(get_session())
     user = auth_service.get_user_by_id(user_id)
     
     if not user:
@@ -140,13 +147,10 @@ def verify_token():
 @token_required
 def debug_user_info():
     """Debug endpoint to check user information and permissions"""
-    from utils.database import Database
     from services.authorization_service import AuthorizationService
     
-    db = Database()
-    session = db.connect()
     try:
-        auth_service_obj = AuthorizationService(session)
+        auth_service_obj = AuthorizationService(get_session())
         user = auth_service_obj.get_user_by_id(request.user_id)
         
         if not user:
@@ -169,6 +173,4 @@ def debug_user_info():
         return jsonify(debug_info), 200
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        db.close(session)
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
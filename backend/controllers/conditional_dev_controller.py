@@ -1,26 +1,20 @@
 # backend/controllers/conditional_dev_controller.py
+import base64
 import os 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from services.conditional_service import ConditionalService
-from utils.database import Database
+from utils.database import get_session
+from utils.pagination import page_size_arg
+from services import graph_catalog, graph_jobs, graph_cache, graph_series, graph_dashboard, metric_export
 from middlewares.auth_middleware import token_required, coach_required, team_access_required, footballer_access_required
-import random
-import numpy as np
-import seaborn as sns
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from datetime import datetime
-from sklearn.linear_model import LinearRegression
 
 conditional_bp = Blueprint('conditional', __name__)
-db = Database()
 
 @conditional_bp.route('/leagues', methods=['GET'])
 @token_required
 def get_leagues():
     """Get all leagues."""
-    session = db.connect()
+    session = get_session()
     try:
         service = ConditionalService(session)
         leagues = service.get_all_leagues()
@@ -29,22 +23,18 @@ def get_leagues():
         return jsonify(leagues), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/teams/<league_id>', methods=['GET'])
 @token_required
 def get_teams(league_id):
     """Get teams by league_id that user can access."""
-    session = db.connect()
+    session = get_session()
     try:
         service = ConditionalService(session)
         teams = service.get_teams_by_league(league_id, user_id=request.user_id)
         return jsonify(teams), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/footballers/<team_id>', methods=['GET'])
 @token_required
@@ -61,7 +51,7 @@ def get_footballers(team_id):
         print(f"DEBUG: Failed to convert team_id to int: {team_id}")
         return jsonify({'error': 'Invalid team ID format'}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         service = ConditionalService(session)
         print(f"DEBUG: Calling get_footballers_by_team with team_id={team_id}, user_id={request.user_id}")
@@ -73,34 +63,50 @@ def get_footballers(team_id):
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Error fetching footballers: {str(e)}'}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-data/<footballer_id>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_footballer_conditional_data(footballer_id):
-    """Get conditional data for a specific footballer."""
-    session = db.connect()
+    """Get conditional data for a specific footballer.
+
+    Pass page_size (and the returned next_cursor as cursor) to page through
+    long histories, and fields=a,b to load only those metrics.
+    """
+    session = get_session()
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()] if request.args.get('fields') else None
         
         service = ConditionalService(session)
-        conditional_data = service.get_conditional_data(footballer_id, start_date=start_date, end_date=end_date)
+
+        # cursor/page_size verilirse sayfalı yanıt döner: {"items": [...], "next_cursor": ...}
+        if 'cursor' in request.args or 'page_size' in request.args:
+            page = service.get_conditional_data_page(
+                footballer_id,
+                page_size_arg(request.args.get('page_size', type=int)),
+                request.args.get('cursor'),
+                start_date=start_date,
+                end_date=end_date,
+                fields=fields
+            )
+            return jsonify(page), 200
+
+        conditional_data = service.get_conditional_data(footballer_id, start_date=start_date, end_date=end_date, fields=fields)
         
         return jsonify(conditional_data), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-data/<footballer_id>/<date>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_conditional_data_by_date(footballer_id, date):
     """Get conditional data for a footballer on a specific date."""
-    session = db.connect()
+    session = get_session()
     try:
         service = ConditionalService(session)
         conditional_entry = service.get_conditional_entry_by_date(footballer_id, date)
@@ -147,23 +153,59 @@ def get_conditional_data_by_date(footballer_id, date):
             'message': 'Error occurred or invalid date format. Default values shown.'
         }
         return jsonify(empty_template), 200
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-data/<footballer_id>', methods=['POST'])
 @coach_required
 @footballer_access_required
 def add_conditional_data(footballer_id):
-    """Add new conditional data for a footballer."""
+    """Add new conditional data for a footballer.
+
+    ?upsert=true overwrites an existing entry for the same day instead of
+    rejecting it.
+    """
+    if not request.is_json:
+        return jsonify({"message": "Missing JSON in request"}), 400
+    
+    session = get_session()
+    try:
+        data = request.get_json()
+        service = ConditionalService(session)
+        
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        result, message = service.add_conditional_data(footballer_id, data, upsert=upsert)
+        
+        if not result:
+            return jsonify({"message": message}), 400
+        
+        return jsonify({
+            "message": message,
+            "data": result
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@conditional_bp.route('/conditional-data/bulk', methods=['POST'])
+@coach_required
+def add_conditional_data_bulk():
+    """Add conditional data for many footballers at once (e.g. a whole squad after a session).
+
+    Body: {"entries": [{"footballer_id": 1, "created_at": "YYYY-MM-DD", ...}, ...]}
+    or the bare list.
+    ?upsert=true overwrites existing entries for the same day instead of
+    skipping them.
+    """
     if not request.is_json:
         return jsonify({"message": "Missing JSON in request"}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         data = request.get_json()
         service = ConditionalService(session)
         
-        result, message = service.add_conditional_data(footballer_id, data)
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        # Hem {"entries": [...]} hem de düz liste kabul edilir
+        entries = data.get('entries') if isinstance(data, dict) else data
+        result, message = service.add_conditional_data_bulk(entries, request.user_id, upsert=upsert)
         
         if not result:
             return jsonify({"message": message}), 400
@@ -172,10 +214,10 @@ def add_conditional_data(footballer_id):
             "message": message,
             "data": result
         }), 201
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-data/<entry_id>', methods=['PUT'])
 @coach_required
@@ -184,7 +226,7 @@ def update_conditional_data(entry_id):
     if not request.is_json:
         return jsonify({"message": "Missing JSON in request"}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         data = request.get_json()
         service = ConditionalService(session)
@@ -200,14 +242,12 @@ def update_conditional_data(entry_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-data/<entry_id>', methods=['DELETE'])
 @coach_required
 def delete_conditional_data(entry_id):
     """Delete conditional data entry."""
-    session = db.connect()
+    session = get_session()
     try:
         service = ConditionalService(session)
         
@@ -221,32 +261,44 @@ def delete_conditional_data(entry_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-history/<footballer_id>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_conditional_history(footballer_id):
-    """Get conditional data history for a footballer."""
-    session = db.connect()
+    """Get conditional data history for a footballer.
+
+    Pass page_size (and the returned next_cursor as cursor) to page through
+    long histories.
+    """
+    session = get_session()
     try:
         limit = request.args.get('limit', 10, type=int)
         
         service = ConditionalService(session)
+
+        # cursor/page_size verilirse sayfalı yanıt döner: {"items": [...], "next_cursor": ...}
+        if 'cursor' in request.args or 'page_size' in request.args:
+            page = service.get_conditional_history_page(
+                footballer_id,
+                page_size_arg(request.args.get('page_size', type=int)),
+                request.args.get('cursor')
+            )
+            return jsonify(page), 200
+
         history = service.get_conditional_history(footballer_id, limit)
         
         return jsonify(history), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @conditional_bp.route('/conditional-data', methods=['POST'])
 @token_required
 def get_conditional_data():
     """Get conditional data for a footballer within a date range."""
-    session = db.connect()
+    session = get_session()
     data = request.json
     try:
         footballer_id = data.get('footballer_id')
@@ -257,22 +309,66 @@ def get_conditional_data():
         service = ConditionalService(session)
         graph_data = service.get_conditional_data(footballer_id, graph_type, start_date, end_date)
         return jsonify(graph_data), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
         
+@conditional_bp.route('/conditional-export', methods=['GET'])
+@token_required
+def export_conditional_data():
+    """Stream conditional history as CSV or NDJSON.
+
+    Query: format=csv|ndjson, team_id, league_id, footballer_id, start_date,
+    end_date (YYYY-MM-DD, inclusive). Non-admin users get their own team.
+    """
+    file_format = request.args.get('format', 'csv').lower()
+    session = get_session()
+    try:
+        service = ConditionalService(session)
+        chunks = service.export_conditional_data(
+            request.user_id,
+            file_format,
+            team_id=request.args.get('team_id', type=int),
+            league_id=request.args.get('league_id'),
+            footballer_id=request.args.get('footballer_id', type=int),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date')
+        )
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    # Request context (ve session) generator bitene kadar açık kalır
+    return Response(
+        stream_with_context(chunks),
+        mimetype=metric_export.FORMATS[file_format],
+        headers={'Content-Disposition': f'attachment; filename=conditional_export.{file_format}'}
+    )
+
 @conditional_bp.route('/generate-graph', methods=['POST'])
 @token_required
+@footballer_access_required
 def generate_graph():
-    """Generate graph based on selected type and date range."""
+    """Generate graph based on selected type and date range.
+
+    With "async": true in the body the render is queued and a job id is
+    returned immediately; poll /graph-jobs/<job_id> for the image path.
+    With "format": "data" the chart series are returned as JSON instead of
+    an image. With "output": "image" (or "base64") the chart is rendered in
+    memory and returned in the response body (or as base64 in JSON) instead
+    of as a file path; "format" (png, webp, svg) and "dpi" apply there.
+    """
     data = request.json
     graph_type = data.get('graph_type')
     start_date = data.get('start_date')
     end_date = data.get('end_date')
     footballer_id = data.get('footballer_id')
     
-    session = db.connect()
+    session = get_session()
     
     try:
         # Fiziksel verileri al
@@ -283,163 +379,128 @@ def generate_graph():
         if not conditional_data:
             return jsonify({'error': 'No data available for the selected criteria'}), 404
 
-        # Verilere göre grafik oluştur
-        days = [data['created_at'] for data in conditional_data]
-        plt.figure(figsize=(10, 5))
-
-        if graph_type == "VO2 Max Progression Over 30 Days":
-            vo2_max_values = [data['vo2_max'] for data in conditional_data]
-            
-            plt.plot(days, vo2_max_values, marker='o',label="VO₂ Max (ml/kg/min)", color='blue')
-            plt.title('VO₂ Max Over 30 Days', fontsize=16, fontweight='bold')
-            plt.xlabel('Days', fontsize=10)
-            plt.ylabel('VO₂ Max (ml/kg/min)', fontsize=14)
-            plt.xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
-            plt.yticks(fontsize=12)
-            plt.grid(True)
-            plt.legend()
-            plt.tight_layout()
-            
-            
-        elif graph_type == "Daily Lactate Levels Monitoring":
-            lactate_levels_values = [data['lactate_levels'] for data in conditional_data]
-            
-            plt.bar(days, lactate_levels_values, color='orange')
-            plt.title('Lactate Levels Over 30 Days', fontsize=16, fontweight='bold')
-            plt.xlabel('Days', fontsize=10)
-            plt.ylabel('Lactate Levels (mmol/L)', fontsize=14)
-            plt.xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
-            plt.yticks(fontsize=12)
-            plt.grid(axis='y')
-            plt.tight_layout()
-
-
-        elif graph_type == "Training Intensity Progression":
-            training_intensity_values = [data['training_intensity'] for data in conditional_data]
-
-            plt.plot(days, training_intensity_values, marker='o', label='Training Intensity', color='green')
-            plt.title('Training Intensity Over 30 Days', fontsize=16, fontweight='bold')
-            plt.xlabel('Days', fontsize=10)
-            plt.ylabel('Training Intensity', fontsize=14)
-            plt.xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
-            plt.yticks(fontsize=12)
-            plt.grid(True)
-            plt.legend()
-            plt.tight_layout()
-
-
-        elif graph_type == "Recovery Distribution":
-            recovery_times_values = [data['recovery_times'] for data in conditional_data]
-            
-            plt.scatter(days, recovery_times_values, color='purple', s=100)
-            plt.title('Recovery Times Over 30 Days', fontsize=16, fontweight='bold')
-            plt.xlabel('Days', fontsize=10)
-            plt.ylabel('Recovery Times (hours)', fontsize=14)
-            plt.xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
-            plt.yticks(fontsize=12)
-            plt.grid(True)
-            plt.tight_layout()
-
-            
-        elif graph_type == "VO2 Max Trend with Regression":
-            vo2_max_values = [data['vo2_max'] for data in conditional_data]
-            days_numeric = [(day - days[0]).days for day in days]  # Gün cinsinden farkları hesapla
-            
-            # NumPy dizisine dönüştür
-            vo2_max_values = np.array(vo2_max_values)  # NumPy array'e çevir
-            days_numeric = np.array(days_numeric)  # NumPy array'e çevir
-
-            # Veriyi reshape et
-            vo2_max_values_reshaped = vo2_max_values.reshape(-1, 1)
-            days_reshaped = days_numeric.reshape(-1, 1)
-            
-            # Doğrusal regresyon modeli oluştur ve eğit
-            model = LinearRegression()
-            model.fit(days_reshaped, vo2_max_values_reshaped)
-            predictions = model.predict(days_reshaped)
-            
-            # Grafiği çiz
-            plt.plot(days_numeric, vo2_max_values, marker='o', label='VO₂ Max (ml/kg/min)', color='blue')
-            plt.plot(days_numeric, predictions, label='Trend Line', color='red', linestyle='--')
-            plt.title('VO₂ Max Trend Over 30 Days', fontsize=16, fontweight='bold')
-            plt.xlabel('Days', fontsize=14)
-            plt.ylabel('VO₂ Max (ml/kg/min)', fontsize=14)
-            plt.xticks(fontsize=12)
-            plt.yticks(fontsize=12)
-            plt.grid(True)
-            plt.legend()
-            plt.tight_layout()
-
-
-
-        elif graph_type == "Conditional Goal Progress Overview":
-
-            # Verileri 'conditional_data' içinden alıyoruz
-            current_vo2_max_values = [data['current_vo2_max'] for data in conditional_data]
-            current_lactate_levels_values = [data['current_lactate_levels'] for data in conditional_data]
-            current_muscle_strength_values = [data['current_muscle_strength'] for data in conditional_data]
-            target_vo2_max_values = [data['target_vo2_max'] for data in conditional_data]
-            target_lactate_level_values = [data['target_lactate_level'] for data in conditional_data]
-            target_muscle_strength_values = [data['target_muscle_strength'] for data in conditional_data]
-
-            # Hedef ve mevcut değerler
-            goals = ['VO2 Max', 'Lactate Levels', 'Muscle Strength']
-            current_values = [
-                np.mean(current_vo2_max_values),
-                np.mean(current_lactate_levels_values),
-                np.mean(current_muscle_strength_values),
-            ]
-            target_values = [
-                np.mean(target_vo2_max_values),
-                np.mean(target_lactate_level_values),
-                np.mean(target_muscle_strength_values),
-            ]
-
-            # X ekseninde çubuklar için pozisyonlar
-            x = np.arange(len(goals))
-            width = 0.35  # Çubuk genişliği
-
-            # Bar plot
-            plt.figure(figsize=(10, 6))
-            plt.bar(x - width/2, current_values, width, label='Current Values', color='lightblue')
-            plt.bar(x + width/2, target_values, width, label='Target Values', color='lightgreen')
-
-            # Grafik başlık ve eksen etiketleri
-            plt.title('Conditional Goal Progress Overview', fontsize=16, fontweight='bold')
-            plt.xlabel('Goals', fontsize=14)
-            plt.ylabel('Values', fontsize=14)
-            plt.xticks(x, goals, fontsize=12)
-            plt.yticks(fontsize=12)
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-            plt.legend(fontsize=12)
-            plt.tight_layout()
-            
-
-        else:
+        if not graph_catalog.is_supported('conditional', graph_type):
             return jsonify({'error': f'Unknown graph type: {graph_type}'}), 400
 
+        # format=data: çizim yerine seriler döner, istemci grafiği kendisi çizer
+        if data.get('format') == 'data':
+            return jsonify(graph_series.build_series('conditional', graph_type, conditional_data)), 200
+
+        # output=image/base64: bellekte çizilir, diske yazılmaz ve ikinci istek gerekmez
+        output = data.get('output', 'file')
+        if output in ('image', 'base64'):
+            try:
+                image_format, dpi = graph_catalog.image_options(data.get('format'), data.get('dpi'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            image = graph_jobs.render_bytes('conditional', graph_type, conditional_data, image_format, dpi)
+            mimetype = graph_catalog.IMAGE_FORMATS[image_format]
+            if output == 'image':
+                return Response(image, mimetype=mimetype), 200
+            return jsonify({
+                'format': image_format,
+                'mimetype': mimetype,
+                'image': base64.b64encode(image).decode('ascii')
+            }), 200
+        if output != 'file':
+            return jsonify({'error': f'Unknown output: {output}. Use file, image or base64'}), 400
 
         # Statik klasöre kaydet
         static_dir = os.path.join(current_app.root_path, 'static', 'graphs', 'conditional_graphs')
         os.makedirs(static_dir, exist_ok=True)
-        file_name = f"{footballer_id}_{graph_type.replace(' ', '_')}_{start_date}_{end_date}.png"
+        file_name = graph_cache.graph_file_name('conditional', graph_type, footballer_id, start_date, end_date, conditional_data)
         file_path = os.path.join(static_dir, file_name)
-        plt.savefig(file_path)
-        plt.close()
+        relative_path = f'/static/graphs/conditional_graphs/{file_name}'
+
+        # Aynı verilerle daha önce çizildiyse tekrar çizme
+        if graph_cache.lookup(file_path):
+            return jsonify({'message': 'Graph generated', 'path': relative_path, 'cached': True}), 200
+
+        if data.get('async'):
+            job_id = graph_jobs.submit(request.user_id, 'conditional', graph_type, conditional_data, file_path, relative_path)
+            return jsonify({
+                'message': 'Graph job queued',
+                'job_id': job_id,
+                'status_url': f'/api/conditional/graph-jobs/{job_id}'
+            }), 202
+
+        # Render worker process'te yapılır (CPU yoğun, API process'inin GIL'ini tutmasın)
+        graph_jobs.render('conditional', graph_type, conditional_data, file_path)
 
         # Dosya gerçekten oluşturuldu mu kontrol et
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Graph file not found at {file_path}")
 
         # Ön uç için göreceli yol döndür
-        relative_path = f'/static/graphs/conditional_graphs/{file_name}'
         return jsonify({'message': 'Graph generated', 'path': relative_path}), 200
 
+    except ValueError as e:
+        # Hatalı tarih biçimi
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         # Hataları yakala ve logla
         print("Error during graph generation:", str(e))
         return jsonify({'error': str(e)}), 500
 
-    finally:
-        # Bağlantıyı kapat
-        db.close(session)
\ No newline at end of file
+@conditional_bp.route('/graph-jobs/<job_id>', methods=['GET'])
+@token_required
+def get_graph_job(job_id):
+    """Get the status of a queued graph render."""
+    job = graph_jobs.get_job(
+        job_id, request.user_id, domain='conditional',
+        output_dir=os.path.join(current_app.root_path, 'static', 'graphs', 'conditional_graphs'),
+        output_url='/static/graphs/conditional_graphs'
+    )
+    if not job:
+        return jsonify({'error': 'Graph job not found'}), 404
+    return jsonify(job), 200
+
+@conditional_bp.route('/generate-dashboard', methods=['POST'])
+@token_required
+@footballer_access_required
+def generate_dashboard():
+    """Generate several graphs of a footballer in one request.
+
+    Body: footballer_id, start_date, end_date and graph_types (every conditional
+    graph if omitted). The data is loaded once and missing graphs are
+    rendered in parallel. Each graph comes back as a path like
+    /generate-graph, as series with "format": "data", or inline with
+    "output": "base64" ("format"/"dpi" as in /generate-graph). A graph that
+    fails has an "error" field.
+    """
+    data = request.json or {}
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    footballer_id = data.get('footballer_id')
+
+    session = get_session()
+
+    try:
+        graph_types = graph_dashboard.graph_types_arg('conditional', data.get('graph_types'))
+        output, image_format, dpi = graph_dashboard.output_options(data)
+
+        # Tüm grafikler için veriler tek sorguda alınır
+        service = ConditionalService(session)
+        conditional_data = service.get_conditional_data(
+            footballer_id,
+            start_date=start_date,
+            end_date=end_date,
+            fields=graph_dashboard.dashboard_fields('conditional', graph_types)
+        )
+        if not conditional_data:
+            return jsonify({'error': 'No data available for the selected criteria'}), 404
+
+        static_dir = os.path.join(current_app.root_path, 'static', 'graphs', 'conditional_graphs')
+        os.makedirs(static_dir, exist_ok=True)
+        graphs = graph_dashboard.build(
+            'conditional', graph_types, conditional_data, footballer_id, start_date, end_date,
+            static_dir, '/static/graphs/conditional_graphs', output, image_format, dpi
+        )
+        return jsonify({'footballer_id': footballer_id, 'graphs': graphs}), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print("Error during dashboard generation:", str(e))
+        return jsonify({'error': str(e)}), 500
@@ -1,26 +1,20 @@
 # backend/controllers/endurance_dev_controller.py
+import base64
 import os 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from services.endurance_service import EnduranceService
-from utils.database import Database
+from utils.database import get_session
+from utils.pagination import page_size_arg
+from services import graph_catalog, graph_jobs, graph_cache, graph_series, graph_dashboard, gps_import, metric_export
 from middlewares.auth_middleware import token_required, coach_required, team_access_required, footballer_access_required
-import random
-import numpy as np
-import seaborn as sns
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from datetime import datetime
 
 endurance_bp = Blueprint('endurance', __name__)
-db = Database()
 
 @endurance_bp.route('/leagues', methods=['GET'])
 @token_required
 def get_leagues():
     """Get all leagues."""
-    session = db.connect()
+    session = get_session()
     try:
         service = EnduranceService(session)
         leagues = service.get_all_leagues()
@@ -29,29 +23,25 @@ def get_leagues():
         return jsonify(leagues), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/teams/<league_id>', methods=['GET'])
 @token_required
 def get_teams(league_id):
     """Get teams by league_id that user can access."""
-    session = db.connect()
+    session = get_session()
     try:
         service = EnduranceService(session)
         teams = service.get_teams_by_league(league_id, user_id=request.user_id)
         return jsonify(teams), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/footballers/<team_id>', methods=['GET'])
 @token_required
 @team_access_required
 def get_footballers(team_id):
     """Get footballers by team_id."""
-    session = db.connect()
+    session = get_session()
     try:
         service = EnduranceService(session)
         footballers = service.get_footballers_by_team(team_id, user_id=request.user_id)
@@ -62,34 +52,50 @@ def get_footballers(team_id):
             'error': f'Error fetching footballers: {str(e)}',
             'traceback': traceback.format_exc()
         }), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-data/<footballer_id>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_footballer_endurance_data(footballer_id):
-    """Get endurance data for a specific footballer."""
-    session = db.connect()
+    """Get endurance data for a specific footballer.
+
+    Pass page_size (and the returned next_cursor as cursor) to page through
+    long histories, and fields=a,b to load only those metrics.
+    """
+    session = get_session()
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()] if request.args.get('fields') else None
         
         service = EnduranceService(session)
-        endurance_data = service.get_endurance_data(footballer_id, start_date=start_date, end_date=end_date)
+
+        # cursor/page_size verilirse sayfalı yanıt döner: {"items": [...], "next_cursor": ...}
+        if 'cursor' in request.args or 'page_size' in request.args:
+            page = service.get_endurance_data_page(
+                footballer_id,
+                page_size_arg(request.args.get('page_size', type=int)),
+                request.args.get('cursor'),
+                start_date=start_date,
+                end_date=end_date,
+                fields=fields
+            )
+            return jsonify(page), 200
+
+        endurance_data = service.get_endurance_data(footballer_id, start_date=start_date, end_date=end_date, fields=fields)
         
         return jsonify(endurance_data), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-data/<footballer_id>/<date>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_endurance_entry_by_date(footballer_id, date):
     """Get endurance data for a footballer on a specific date."""
-    session = db.connect()
+    session = get_session()
     try:
         service = EnduranceService(session)
         endurance_entry = service.get_endurance_entry_by_date(footballer_id, date)
@@ -100,23 +106,96 @@ def get_endurance_entry_by_date(footballer_id, date):
         return jsonify(endurance_entry), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-data/<footballer_id>', methods=['POST'])
 @coach_required
 @footballer_access_required
 def add_endurance_data(footballer_id):
-    """Add new endurance data for a footballer."""
+    """Add new endurance data for a footballer.
+
+    ?upsert=true overwrites an existing entry for the same day instead of
+    rejecting it.
+    """
+    if not request.is_json:
+        return jsonify({"message": "Missing JSON in request"}), 400
+    
+    session = get_session()
+    try:
+        data = request.get_json()
+        service = EnduranceService(session)
+        
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        result, message = service.add_endurance_data(footballer_id, data, upsert=upsert)
+        
+        if not result:
+            return jsonify({"message": message}), 400
+        
+        return jsonify({
+            "message": message,
+            "data": result
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@endurance_bp.route('/endurance-data/bulk', methods=['POST'])
+@coach_required
+def add_endurance_data_bulk():
+    """Add endurance data for many footballers at once (e.g. a whole squad after a session).
+
+    Body: {"entries": [{"footballer_id": 1, "created_at": "YYYY-MM-DD", ...}, ...]}
+    or the bare list.
+    ?upsert=true overwrites existing entries for the same day instead of
+    skipping them.
+    """
     if not request.is_json:
         return jsonify({"message": "Missing JSON in request"}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         data = request.get_json()
         service = EnduranceService(session)
         
-        result, message = service.add_endurance_data(footballer_id, data)
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        # Hem {"entries": [...]} hem de düz liste kabul edilir
+        entries = data.get('entries') if isinstance(data, dict) else data
+        result, message = service.add_endurance_data_bulk(entries, request.user_id, upsert=upsert)
+        
+        if not result:
+            return jsonify({"message": message}), 400
+        
+        return jsonify({
+            "message": message,
+            "data": result
+        }), 201
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@endurance_bp.route('/endurance-data/import', methods=['POST'])
+@coach_required
+def import_endurance_data():
+    """Import a GPS/wearable export (multipart field "file", csv or parquet).
+
+    Samples are aggregated into one endurance entry per footballer per day.
+    The format comes from ?format= or the file extension; ?upsert=true
+    overwrites existing entries for the same day.
+    """
+    uploaded = request.files.get('file')
+    if not uploaded:
+        return jsonify({"message": "Missing file in request"}), 400
+
+    file_format = request.args.get('format') or gps_import.detect_format(uploaded.filename)
+    if not file_format:
+        return jsonify({"message": "Unknown file format, use ?format=csv or ?format=parquet"}), 400
+    
+    session = get_session()
+    try:
+        service = EnduranceService(session)
+        
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        # Werkzeug büyük yüklemeleri diske yazar, dosya parça parça okunur
+        result, message = service.import_gps_file(uploaded.stream, file_format.lower(), request.user_id, upsert=upsert)
         
         if not result:
             return jsonify({"message": message}), 400
@@ -125,10 +204,10 @@ def add_endurance_data(footballer_id):
             "message": message,
             "data": result
         }), 201
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-data/<entry_id>', methods=['PUT'])
 @coach_required
@@ -137,7 +216,7 @@ def update_endurance_data(entry_id):
     if not request.is_json:
         return jsonify({"message": "Missing JSON in request"}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         data = request.get_json()
         service = EnduranceService(session)
@@ -153,14 +232,12 @@ def update_endurance_data(entry_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-data/<entry_id>', methods=['DELETE'])
 @coach_required
 def delete_endurance_data(entry_id):
     """Delete endurance data entry."""
-    session = db.connect()
+    session = get_session()
     try:
         service = EnduranceService(session)
         
@@ -174,32 +251,44 @@ def delete_endurance_data(entry_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-history/<footballer_id>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_endurance_history(footballer_id):
-    """Get endurance data history for a footballer."""
-    session = db.connect()
+    """Get endurance data history for a footballer.
+
+    Pass page_size (and the returned next_cursor as cursor) to page through
+    long histories.
+    """
+    session = get_session()
     try:
         limit = request.args.get('limit', 10, type=int)
         
         service = EnduranceService(session)
+
+        # cursor/page_size verilirse sayfalı yanıt döner: {"items": [...], "next_cursor": ...}
+        if 'cursor' in request.args or 'page_size' in request.args:
+            page = service.get_endurance_history_page(
+                footballer_id,
+                page_size_arg(request.args.get('page_size', type=int)),
+                request.args.get('cursor')
+            )
+            return jsonify(page), 200
+
         history = service.get_endurance_history(footballer_id, limit)
         
         return jsonify(history), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @endurance_bp.route('/endurance-data', methods=['POST'])
 @token_required
 def get_endurance_data():
     """Get endurance data for a footballer within a date range."""
-    session = db.connect()
+    session = get_session()
     data = request.json
     try:
         footballer_id = data.get('footballer_id')
@@ -212,20 +301,62 @@ def get_endurance_data():
         return jsonify(graph_data), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
         
+@endurance_bp.route('/endurance-export', methods=['GET'])
+@token_required
+def export_endurance_data():
+    """Stream endurance history as CSV or NDJSON.
+
+    Query: format=csv|ndjson, team_id, league_id, footballer_id, start_date,
+    end_date (YYYY-MM-DD, inclusive). Non-admin users get their own team.
+    """
+    file_format = request.args.get('format', 'csv').lower()
+    session = get_session()
+    try:
+        service = EnduranceService(session)
+        chunks = service.export_endurance_data(
+            request.user_id,
+            file_format,
+            team_id=request.args.get('team_id', type=int),
+            league_id=request.args.get('league_id'),
+            footballer_id=request.args.get('footballer_id', type=int),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date')
+        )
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    # Request context (ve session) generator bitene kadar açık kalır
+    return Response(
+        stream_with_context(chunks),
+        mimetype=metric_export.FORMATS[file_format],
+        headers={'Content-Disposition': f'attachment; filename=endurance_export.{file_format}'}
+    )
+
 @endurance_bp.route('/generate-graph', methods=['POST'])
 @token_required
+@footballer_access_required
 def generate_graph():
-    """Generate graph based on selected type and date range."""
+    """Generate graph based on selected type and date range.
+
+    With "async": true in the body the render is queued and a job id is
+    returned immediately; poll /graph-jobs/<job_id> for the image path.
+    With "format": "data" the chart series are returned as JSON instead of
+    an image. With "output": "image" (or "base64") the chart is rendered in
+    memory and returned in the response body (or as base64 in JSON) instead
+    of as a file path; "format" (png, webp, svg) and "dpi" apply there.
+    """
     data = request.json
     graph_type = data.get('graph_type')
     start_date = data.get('start_date')
     end_date = data.get('end_date')
     footballer_id = data.get('footballer_id')
     
-    session = db.connect()
+    session = get_session()
     
     try:
         # Fiziksel verileri al
@@ -236,158 +367,65 @@ def generate_graph():
         if not endurance_data:
             return jsonify({'error': 'No data available for the selected criteria'}), 404
 
-        # Verilere göre grafik oluştur
-        days = [data['created_at'] for data in endurance_data]
-        plt.figure(figsize=(10, 5))
-
-        if graph_type == "Key Endurance Metrics Overview":
-            running_distance_values = [data['running_distance'] for data in endurance_data]
-            average_speed_values = [data['average_speed'] for data in endurance_data]
-            heart_rate_values = [data['heart_rate'] for data in endurance_data]
-            
-            fig, ax = plt.subplots(1, 3, figsize=(10, 5))
-            
-            # Running Distance Card
-            ax[0].barh(['Player'], [np.mean(running_distance_values)], color='lightblue')
-            ax[0].set_xlim(0, 10)
-            ax[0].set_title('Average Running Distance (km)', fontsize=14)
-            ax[0].text(np.mean(running_distance_values) + 0.1, 0, f"{np.mean(running_distance_values):.2f}", va='center')
-
-            # Average Speed Card
-            ax[1].barh(['Player'], [np.mean(average_speed_values)], color='lightgreen')
-            ax[1].set_xlim(0, 15)
-            ax[1].set_title('Average Speed (km/h)', fontsize=14)
-            ax[1].text(np.mean(average_speed_values) + 0.1, 0, f"{np.mean(average_speed_values):.2f}", va='center')
-
-            # Heart Rate Card
-            ax[2].barh(['Player'], [np.mean(heart_rate_values)], color='salmon')
-            ax[2].set_xlim(100, 200)
-            ax[2].set_title('Average Heart Rate (bpm)', fontsize=14)
-            ax[2].text(np.mean(heart_rate_values) + 1, 0, f"{np.mean(heart_rate_values):.2f}", va='center')
-
-            # Adjust layout
-            plt.tight_layout()
-            
-            
-        elif graph_type == "Endurance Trends":
-            running_distance_values = [data['running_distance'] for data in endurance_data]
-            average_speed_values = [data['average_speed'] for data in endurance_data]
-            heart_rate_values = [data['heart_rate'] for data in endurance_data]
-            
-            plt.plot(days, running_distance_values, marker='o', color='royalblue', label='Running Distance (km)')
-            plt.plot(days, average_speed_values, marker='o', color='orange', label='Average Speed (km/h)')
-            plt.plot(days, heart_rate_values, marker='o', color='red', label='Heart Rate (bpm)')
-            plt.title('Endurance Metrics Over 30 Days', fontsize=16, fontweight='bold')
-            plt.xlabel('Days', fontsize=10)
-            plt.ylabel('Values', fontsize=14)
-            plt.xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
-            plt.yticks(fontsize=10)
-            plt.legend()
-            plt.grid()
-            plt.tight_layout()
-
-
-        elif graph_type == "Peak Heart Rate Focused Endurance Development":
-            session_values = [data['session'] for data in endurance_data]
-            peak_heart_rate_values = [data['peak_heart_rate'] for data in endurance_data]
-
-            # Create the plot with a professional style (using 'ggplot' style)
-            plt.style.use('ggplot')  # Using a built-in style from matplotlib
-
-            # Plotting the peak heart rate with a bar chart and adding edge color
-            bars = plt.bar(session_values, peak_heart_rate_values, color='slateblue', width=0.6, edgecolor='black')
-
-            # Adding horizontal lines for clarity
-            plt.axhline(y=np.mean(peak_heart_rate_values), color='r', linestyle='--', label=f'Mean: {np.mean(peak_heart_rate_values):.2f} bpm')
-
-            # Title and labels with professional font settings
-            plt.title('Peak Heart Rate Development Over 10 Sessions', fontsize=18, fontweight='bold')
-            plt.xlabel('Sessions', fontsize=14, fontweight='bold')
-            plt.ylabel('Peak Heart Rate (bpm)', fontsize=14, fontweight='bold')
-
-            # Add custom ticks and grid
-            plt.xticks(session_values, fontsize=12)
-            plt.yticks(fontsize=12)
-            plt.grid(True, linestyle=':', color='gray', alpha=0.6)
-
-            # Adding value labels on top of the bars for clarity
-            for bar in bars:
-                yval = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width() / 2, yval + 2, round(yval, 1), ha='center', va='bottom', fontsize=10)
-
-            # Display the plot with a tight layout
-            plt.legend(loc='upper left', fontsize=12)
-            plt.tight_layout()
-
-
-        elif graph_type == "Performance Radar":
-            # Oyuncunun verileri
-            running_distance_values = [data['running_distance'] for data in endurance_data]
-            average_speed_values = [data['average_speed'] for data in endurance_data]
-            heart_rate_values = [data['heart_rate'] for data in endurance_data]
-            player_values = [np.mean(running_distance_values), np.mean(average_speed_values), np.mean(heart_rate_values)]
-            
-            # Diğer oyuncuların verileri için sorgu
-            footballer_id = data.get('footballer_id')  # Kullanıcıdan "team_id" bilgisi alınmalı
-            other_players_data = service.get_other_players_data(footballer_id, start_date, end_date)
-            
-            # Diğer oyuncuların verilerinin ortalamalarını hesapla
-            other_running_distance_values = [item['running_distance'] for item in other_players_data]
-            other_average_speed_values = [item['average_speed'] for item in other_players_data]
-            other_heart_rate_values = [item['heart_rate'] for item in other_players_data]
-            other_players_values = [
-                np.mean(other_running_distance_values) if other_running_distance_values else 0,
-                np.mean(other_average_speed_values) if other_average_speed_values else 0,
-                np.mean(other_heart_rate_values) if other_heart_rate_values else 0
-            ]
-
-            # Radar grafiği için kategoriler
-            categories = ['Running Distance (km)', 'Average Speed (km/h)', 'Heart Rate (bpm)']
-            num_vars = len(categories)
-
-            # Açıları hesapla
-            angles = np.linspace(0, 2 * np.pi, num_vars, endpoint=False).tolist()
-
-            # Verileri çemberin kapatılması için döngüyü tamamla
-            player_values += player_values[:1]
-            other_players_values += other_players_values[:1]
-            angles += angles[:1]
-
-            # Radar grafiği oluştur
-            fig, ax = plt.subplots(figsize=(8, 5), subplot_kw=dict(polar=True))
-            ax.fill(angles, player_values, color='blue', alpha=0.25, label='Player')
-            ax.fill(angles, other_players_values, color='red', alpha=0.25, label='Team Average')
-
-            # Etiketler ve grafik ayarları
-            ax.set_yticklabels([])
-            ax.set_xticks(angles[:-1])
-            ax.set_xticklabels(categories, fontsize=12)
-            ax.set_title('Endurance Comparison (Radar Chart)', fontsize=16, fontweight='bold')
-            ax.legend(loc='upper right', bbox_to_anchor=(1.1, 1.1))
-
-            # Arka plan olmadan göster
-            ax.spines['polar'].set_visible(False)  # Arka planı kaldır
-            plt.tight_layout()
-
-
-        else:
+        if not graph_catalog.is_supported('endurance', graph_type):
             return jsonify({'error': f'Unknown graph type: {graph_type}'}), 400
 
+        # Radar grafiği takım ortalaması ile karşılaştırır
+        other_players_data = None
+        if graph_type == "Performance Radar":
+            other_players_data = service.get_other_players_data(footballer_id, start_date, end_date)
+
+        # format=data: çizim yerine seriler döner, istemci grafiği kendisi çizer
+        if data.get('format') == 'data':
+            return jsonify(graph_series.build_series('endurance', graph_type, endurance_data, other_players_data)), 200
+
+        # output=image/base64: bellekte çizilir, diske yazılmaz ve ikinci istek gerekmez
+        output = data.get('output', 'file')
+        if output in ('image', 'base64'):
+            try:
+                image_format, dpi = graph_catalog.image_options(data.get('format'), data.get('dpi'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            image = graph_jobs.render_bytes('endurance', graph_type, endurance_data, image_format, dpi, other_players_data)
+            mimetype = graph_catalog.IMAGE_FORMATS[image_format]
+            if output == 'image':
+                return Response(image, mimetype=mimetype), 200
+            return jsonify({
+                'format': image_format,
+                'mimetype': mimetype,
+                'image': base64.b64encode(image).decode('ascii')
+            }), 200
+        if output != 'file':
+            return jsonify({'error': f'Unknown output: {output}. Use file, image or base64'}), 400
 
         # Statik klasöre kaydet
         static_dir = os.path.join(current_app.root_path, 'static', 'graphs', 'endurance_graphs')
         os.makedirs(static_dir, exist_ok=True)
-        file_name = f"{footballer_id}_{graph_type.replace(' ', '_')}_{start_date}_{end_date}.png"
+        file_name = graph_cache.graph_file_name('endurance', graph_type, footballer_id, start_date, end_date, endurance_data, other_players_data)
         file_path = os.path.join(static_dir, file_name)
-        plt.savefig(file_path)
-        plt.close()
+        relative_path = f'/static/graphs/endurance_graphs/{file_name}'
+
+        # Aynı verilerle daha önce çizildiyse tekrar çizme
+        if graph_cache.lookup(file_path):
+            return jsonify({'message': 'Graph generated', 'path': relative_path, 'cached': True}), 200
+
+        if data.get('async'):
+            job_id = graph_jobs.submit(request.user_id, 'endurance', graph_type, endurance_data, file_path, relative_path, other_players_data)
+            return jsonify({
+                'message': 'Graph job queued',
+                'job_id': job_id,
+                'status_url': f'/api/endurance/graph-jobs/{job_id}'
+            }), 202
+
+        # Render worker process'te yapılır (CPU yoğun, API process'inin GIL'ini tutmasın)
+        graph_jobs.render('endurance', graph_type, endurance_data, file_path, other_players_data)
 
         # Dosya gerçekten oluşturuldu mu kontrol et
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Graph file not found at {file_path}")
 
         # Ön uç için göreceli yol döndür
-        relative_path = f'/static/graphs/endurance_graphs/{file_name}'
         return jsonify({'message': 'Graph generated', 'path': relative_path}), 200
 
     except Exception as e:
@@ -395,6 +433,70 @@ def generate_graph():
         print("Error during graph generation:", str(e))
         return jsonify({'error': str(e)}), 500
 
-    finally:
-        # Bağlantıyı kapat
-        db.close(session)
\ No newline at end of file
+@endurance_bp.route('/graph-jobs/<job_id>', methods=['GET'])
+@token_required
+def get_graph_job(job_id):
+    """Get the status of a queued graph render."""
+    job = graph_jobs.get_job(
+        job_id, request.user_id, domain='endurance',
+        output_dir=os.path.join(current_app.root_path, 'static', 'graphs', 'endurance_graphs'),
+        output_url='/static/graphs/endurance_graphs'
+    )
+    if not job:
+        return jsonify({'error': 'Graph job not found'}), 404
+    return jsonify(job), 200
+
+@endurance_bp.route('/generate-dashboard', methods=['POST'])
+@token_required
+@footballer_access_required
+def generate_dashboard():
+    """Generate several graphs of a footballer in one request.
+
+    Body: footballer_id, start_date, end_date and graph_types (every endurance
+    graph if omitted). The data is loaded once and missing graphs are
+    rendered in parallel. Each graph comes back as a path like
+    /generate-graph, as series with "format": "data", or inline with
+    "output": "base64" ("format"/"dpi" as in /generate-graph). A graph that
+    fails has an "error" field.
+    """
+    data = request.json or {}
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    footballer_id = data.get('footballer_id')
+
+    session = get_session()
+
+    try:
+        graph_types = graph_dashboard.graph_types_arg('endurance', data.get('graph_types'))
+        output, image_format, dpi = graph_dashboard.output_options(data)
+
+        # Tüm grafikler için veriler tek sorguda alınır
+        service = EnduranceService(session)
+        endurance_data = service.get_endurance_data(
+            footballer_id,
+            start_date=start_date,
+            end_date=end_date,
+            fields=graph_dashboard.dashboard_fields('endurance', graph_types)
+        )
+        if not endurance_data:
+            return jsonify({'error': 'No data available for the selected criteria'}), 404
+
+        # Radar grafiği takım ortalaması ile karşılaştırır
+        other_players_data = {}
+        if "Performance Radar" in graph_types:
+            other_players_data["Performance Radar"] = service.get_other_players_data(footballer_id, start_date, end_date)
+
+        static_dir = os.path.join(current_app.root_path, 'static', 'graphs', 'endurance_graphs')
+        os.makedirs(static_dir, exist_ok=True)
+        graphs = graph_dashboard.build(
+            'endurance', graph_types, endurance_data, footballer_id, start_date, end_date,
+            static_dir, '/static/graphs/endurance_graphs', output, image_format, dpi,
+            other_players_data=other_players_data
+        )
+        return jsonify({'footballer_id': footballer_id, 'graphs': graphs}), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print("Error during dashboard generation:", str(e))
+        return jsonify({'error': str(e)}), 500
@@ -1,26 +1,20 @@
 # backend/controllers/physical_dev_controller.py
+import base64
 import os 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from services.physical_service import PhysicalService
-from utils.database import Database
+from utils.database import get_session
+from utils.pagination import page_size_arg
+from services import graph_catalog, graph_jobs, graph_cache, graph_series, graph_dashboard, metric_export
 from middlewares.auth_middleware import token_required, coach_required, team_access_required, footballer_access_required
-import random
-import numpy as np
-import seaborn as sns
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from datetime import datetime
 
 physical_bp = Blueprint('physical', __name__)
-db = Database()
 
 @physical_bp.route('/leagues', methods=['GET'])
 @token_required
 def get_leagues():
     """Get all leagues."""
-    session = db.connect()
+    session = get_session()
     try:
         service = PhysicalService(session)
         leagues = service.get_all_leagues()
@@ -29,63 +23,75 @@ def get_leagues():
         return jsonify(leagues), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/teams/<league_id>', methods=['GET'])
 @token_required
 def get_teams(league_id):
     """Get teams by league_id that user can access."""
-    session = db.connect()
+    session = get_session()
     try:
         service = PhysicalService(session)
         teams = service.get_teams_by_league(league_id, user_id=request.user_id)
         return jsonify(teams), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/footballers/<team_id>', methods=['GET'])
 @token_required
 @team_access_required
 def get_footballers(team_id):
     """Get footballers by team_id."""
-    session = db.connect()
+    session = get_session()
     try:
         service = PhysicalService(session)
         footballers = service.get_footballers_by_team(team_id, user_id=request.user_id)
         return jsonify(footballers), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-data/<footballer_id>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_footballer_physical_data(footballer_id):
-    """Get physical data for a specific footballer."""
-    session = db.connect()
+    """Get physical data for a specific footballer.
+
+    Pass page_size (and the returned next_cursor as cursor) to page through
+    long histories, and fields=a,b to load only those metrics.
+    """
+    session = get_session()
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()] if request.args.get('fields') else None
         
         service = PhysicalService(session)
-        physical_data = service.get_physical_data(footballer_id, start_date=start_date, end_date=end_date)
+
+        # cursor/page_size verilirse sayfalı yanıt döner: {"items": [...], "next_cursor": ...}
+        if 'cursor' in request.args or 'page_size' in request.args:
+            page = service.get_physical_data_page(
+                footballer_id,
+                page_size_arg(request.args.get('page_size', type=int)),
+                request.args.get('cursor'),
+                start_date=start_date,
+                end_date=end_date,
+                fields=fields
+            )
+            return jsonify(page), 200
+
+        physical_data = service.get_physical_data(footballer_id, start_date=start_date, end_date=end_date, fields=fields)
         
         return jsonify(physical_data), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-data/<footballer_id>/<date>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_physical_data_by_date(footballer_id, date):
     """Get physical data for a footballer on a specific date."""
-    session = db.connect()
+    session = get_session()
     try:
         service = PhysicalService(session)
         physical_entry = service.get_physical_entry_by_date(footballer_id, date)
@@ -134,23 +140,59 @@ def get_physical_data_by_date(footballer_id, date):
             'message': 'Error occurred or invalid date format. Default values shown.'
         }
         return jsonify(empty_template), 200
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-data/<footballer_id>', methods=['POST'])
 @coach_required
 @footballer_access_required
 def add_physical_data(footballer_id):
-    """Add new physical data for a footballer."""
+    """Add new physical data for a footballer.
+
+    ?upsert=true overwrites an existing entry for the same day instead of
+    rejecting it.
+    """
+    if not request.is_json:
+        return jsonify({"message": "Missing JSON in request"}), 400
+    
+    session = get_session()
+    try:
+        data = request.get_json()
+        service = PhysicalService(session)
+        
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        result, message = service.add_physical_data(footballer_id, data, upsert=upsert)
+        
+        if not result:
+            return jsonify({"message": message}), 400
+        
+        return jsonify({
+            "message": message,
+            "data": result
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@physical_bp.route('/physical-data/bulk', methods=['POST'])
+@coach_required
+def add_physical_data_bulk():
+    """Add physical data for many footballers at once (e.g. a whole squad after a session).
+
+    Body: {"entries": [{"footballer_id": 1, "created_at": "YYYY-MM-DD", ...}, ...]}
+    or the bare list.
+    ?upsert=true overwrites existing entries for the same day instead of
+    skipping them.
+    """
     if not request.is_json:
         return jsonify({"message": "Missing JSON in request"}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         data = request.get_json()
         service = PhysicalService(session)
         
-        result, message = service.add_physical_data(footballer_id, data)
+        upsert = request.args.get('upsert', 'false').lower() in ('1', 'true', 'yes')
+        # Hem {"entries": [...]} hem de düz liste kabul edilir
+        entries = data.get('entries') if isinstance(data, dict) else data
+        result, message = service.add_physical_data_bulk(entries, request.user_id, upsert=upsert)
         
         if not result:
             return jsonify({"message": message}), 400
@@ -159,10 +201,10 @@ def add_physical_data(footballer_id):
             "message": message,
             "data": result
         }), 201
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-data/<entry_id>', methods=['PUT'])
 @coach_required
@@ -171,7 +213,7 @@ def update_physical_data(entry_id):
     if not request.is_json:
         return jsonify({"message": "Missing JSON in request"}), 400
     
-    session = db.connect()
+    session = get_session()
     try:
         data = request.get_json()
         service = PhysicalService(session)
@@ -187,14 +229,12 @@ def update_physical_data(entry_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-data/<entry_id>', methods=['DELETE'])
 @coach_required
 def delete_physical_data(entry_id):
     """Delete physical data entry."""
-    session = db.connect()
+    session = get_session()
     try:
         service = PhysicalService(session)
         
@@ -208,32 +248,44 @@ def delete_physical_data(entry_id):
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-history/<footballer_id>', methods=['GET'])
 @token_required
 @footballer_access_required
 def get_physical_history(footballer_id):
-    """Get physical data history for a footballer."""
-    session = db.connect()
+    """Get physical data history for a footballer.
+
+    Pass page_size (and the returned next_cursor as cursor) to page through
+    long histories.
+    """
+    session = get_session()
     try:
         limit = request.args.get('limit', 10, type=int)
         
         service = PhysicalService(session)
+
+        # cursor/page_size verilirse sayfalı yanıt döner: {"items": [...], "next_cursor": ...}
+        if 'cursor' in request.args or 'page_size' in request.args:
+            page = service.get_physical_history_page(
+                footballer_id,
+                page_size_arg(request.args.get('page_size', type=int)),
+                request.args.get('cursor')
+            )
+            return jsonify(page), 200
+
         history = service.get_physical_history(footballer_id, limit)
         
         return jsonify(history), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
 
 @physical_bp.route('/physical-data', methods=['POST'])
 @token_required
 def get_physical_data():
     """Get physical data for a footballer within a date range."""
-    session = db.connect()
+    session = get_session()
     data = request.json
     try:
         footballer_id = data.get('footballer_id')
@@ -246,20 +298,62 @@ def get_physical_data():
         return jsonify(graph_data), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        db.close(session)
         
+@physical_bp.route('/physical-export', methods=['GET'])
+@token_required
+def export_physical_data():
+    """Stream physical history as CSV or NDJSON.
+
+    Query: format=csv|ndjson, team_id, league_id, footballer_id, start_date,
+    end_date (YYYY-MM-DD, inclusive). Non-admin users get their own team.
+    """
+    file_format = request.args.get('format', 'csv').lower()
+    session = get_session()
+    try:
+        service = PhysicalService(session)
+        chunks = service.export_physical_data(
+            request.user_id,
+            file_format,
+            team_id=request.args.get('team_id', type=int),
+            league_id=request.args.get('league_id'),
+            footballer_id=request.args.get('footballer_id', type=int),
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date')
+        )
+    except PermissionError as e:
+        return jsonify({'message': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    # Request context (ve session) generator bitene kadar açık kalır
+    return Response(
+        stream_with_context(chunks),
+        mimetype=metric_export.FORMATS[file_format],
+        headers={'Content-Disposition': f'attachment; filename=physical_export.{file_format}'}
+    )
+
 @physical_bp.route('/generate-graph', methods=['POST'])
 @token_required
+@footballer_access_required
 def generate_graph():
-    """Generate graph based on selected type and date range."""
+    """Generate graph based on selected type and date range.
+
+    With "async": true in the body the render is queued and a job id is
+    returned immediately; poll /graph-jobs/<job_id> for the image path.
+    With "format": "data" the chart series are returned as JSON instead of
+    an image. With "output": "image" (or "base64") the chart is rendered in
+    memory and returned in the response body (or as base64 in JSON) instead
+    of as a file path; "format" (png, webp, svg) and "dpi" apply there.
+    """
     data = request.json
     graph_type = data.get('graph_type')
     start_date = data.get('start_date')
     end_date = data.get('end_date')
     footballer_id = data.get('footballer_id')
     
-    session = db.connect()
+    session = get_session()
     
     try:
         # Get physical data
@@ -270,247 +364,60 @@ def generate_graph():
         if not physical_data:
             return jsonify({'error': 'No data available for the selected criteria'}), 404
 
-        # Convert string dates to datetime objects for plotting
-        days = [datetime.strptime(data['created_at'], '%Y-%m-%d') for data in physical_data]
-        plt.figure(figsize=(10, 5))
-        
-        def get_color(value, target):
-            percentage = (value / target) * 100
-            
-            if percentage >= 85:  # Green for 85% and above
-                return "#6BBE45"  # Matte Green
-            elif percentage >= 70:  # Light orange for 70% to 85%
-                return "#FFA500"  # Matte Orange
-            else:  # Red for below 70%
-                return "#D32F2F"  # Matte Red
-            
-        def convert_height_to_float(height_str):
-                if height_str:
-                    # Remove 'm' or 'cm' units and strip spaces
-                    height_str = height_str.replace("m", "").replace("cm", "").strip()
-                    # Replace commas with dots
-                    height_str = height_str.replace(",", ".")
-                    try:
-                        return float(height_str)
-                    except ValueError:
-                        return 0.0  # Return 0.0 in case of invalid value
-                return 0.0
-
-        if graph_type == "Physical Progress Tracker":
-            metrics = {
-                "Muscle Mass (kg)": [data['muscle_mass'] for data in physical_data],
-                "Muscle Strength (kg)": [data['muscle_strength'] for data in physical_data],
-                "Muscle Endurance (reps)": [data['muscle_endurance'] for data in physical_data],
-                "Flexibility (cm)": [data['flexibility'] for data in physical_data]
-            }
-
-            targets = {metric: max(values) + random.randint(-20, +20) for metric, values in metrics.items()}
-
-            # Tek grafik için oluşturulmuş figür
-            fig, ax = plt.subplots(figsize=(10, 6))
-
-            ax.set_facecolor('#f0f0f0')
-            card_width = 180
-            card_height = 100
-            ax.set_xlim(0, card_width * len(metrics))
-            ax.set_ylim(0, card_height)
-
-            for i, (metric, values) in enumerate(metrics.items()):
-                avg_value = sum(values) / len(values)
-                target = targets[metric]
-                percentage = (avg_value / target) * 100
-                color = get_color(avg_value, target)
-
-                # Metrik kartını çiz
-                ax.add_patch(Rectangle((i * card_width, 0), card_width, card_height, color='white', alpha=0.9))
-                fill_height = (avg_value / target) * card_height
-                ax.add_patch(Rectangle((i * card_width, 0), card_width, fill_height, color=color))
-
-                # Metin etiketleri ekle
-                ax.text((i + 0.5) * card_width, 60, f'Avg: {avg_value:.1f}', ha='center', fontsize=10)
-                ax.text((i + 0.5) * card_width, 40, f'Target: {target}', ha='center', fontsize=10)
-                ax.text((i + 0.5) * card_width, 20, f'{percentage:.1f}%', ha='center', fontsize=10, color=color)
-                ax.text((i + 0.5) * card_width, 5, metric, ha='center', fontsize=9)
-
-            ax.axis('off')
-
-        elif graph_type == "Training Progress Time Tracker":
-            # Verilerden metrikleri çıkartma
-            metrics = {
-                "Muscle Mass (kg)": [data['muscle_mass'] for data in physical_data],
-                "Muscle Strength (kg)": [data['muscle_strength'] for data in physical_data],
-                "Muscle Endurance (reps)": [data['muscle_endurance'] for data in physical_data],
-                "Flexibility (cm)": [data['flexibility'] for data in physical_data]
-            }
-
-            # Hedef değerlerin dinamik olarak belirlenmesi: Her metrik için max değerin üzerine rastgele bir değer ekleniyor
-            targets = {metric: max(values) + random.randint(-20, +20) for metric, values in metrics.items()}
-
-            # Yüzdelik hesaplamalar
-            muscle_mass_percentage = [(value / targets["Muscle Mass (kg)"]) * 100 for value in metrics["Muscle Mass (kg)"]]
-            muscle_strength_percentage = [(value / targets["Muscle Strength (kg)"]) * 100 for value in metrics["Muscle Strength (kg)"]]
-            muscle_endurance_percentage = [(value / targets["Muscle Endurance (reps)"]) * 100 for value in metrics["Muscle Endurance (reps)"]]
-            flexibility_percentage = [(value / targets["Flexibility (cm)"]) * 100 for value in metrics["Flexibility (cm)"]]
-
-            # Grafiğin çizilmesi
-            plt.plot(days, muscle_mass_percentage, label="Muscle Mass (%)")
-            plt.plot(days, muscle_strength_percentage, label="Muscle Strength (%)")
-            plt.plot(days, muscle_endurance_percentage, label="Muscle Endurance (%)")
-            plt.plot(days, flexibility_percentage, label="Flexibility (%)")
-
-            # Başlık ve etiketler
-            plt.title("Training Progress Time Tracker")
-            plt.xlabel("Date")
-            plt.ylabel("Value (%)")
-
-            # Grafik üzerinde etiketler ve grid
-            plt.legend()
-            plt.grid(True)
-
-            # X eksenindeki tarihleri daha okunabilir hale getirmek için döndürme
-            plt.xticks(rotation=45)
-
-            # Layout düzenlemesi
-            plt.tight_layout()
-
-        elif graph_type == "Body Composition Progress Tracker":
-            weight_values = [data['weight'] for data in physical_data]
-            height_values = [convert_height_to_float(data['heights']) for data in physical_data]
-            muscle_mass_values = [data['muscle_mass'] for data in physical_data]
-
-            # Grafik oluşturulması
-            plt.figure(figsize=(10, 5))
-
-            # Ağırlık, boy ve kas kütlesi için çizimler
-            plt.fill_between(days, weight_values, color='lightblue', alpha=0.5, label='Weight (kg)')
-            plt.fill_between(days, height_values, color='lightgreen', alpha=0.5, label='Height (cm)')
-            plt.fill_between(days, muscle_mass_values, color='salmon', alpha=0.5, label='Muscle Mass (kg)')
-
-            # Başlık ve etiketler
-            plt.title("Body Composition Progress Tracker", fontsize=16)
-            plt.xlabel("Date", fontsize=10)
-            plt.ylabel("Value", fontsize=14)
-            plt.xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
-            plt.yticks(np.arange(0, max(weight_values + height_values + muscle_mass_values) + 5, 5))
-
-            # Grafik üzerinde etiketler ve grid
-            plt.legend(loc='upper right')
-            plt.grid(True)
-            
-        elif graph_type == "Athletic Performance Radar Analysis":
-            metrics = {
-                "Muscle Mass (kg)": [data['muscle_mass'] for data in physical_data],
-                "Muscle Strength (kg)": [data['muscle_strength'] for data in physical_data],
-                "Muscle Endurance (reps)": [data['muscle_endurance'] for data in physical_data],
-                "Flexibility (cm)": [data['flexibility'] for data in physical_data]
-            }
-
-            averages = [sum(values) / len(values) for values in metrics.values()]
-            labels = list(metrics.keys())
-
-            angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-            averages += averages[:1]  # Close the radar chart
-            angles += angles[:1]
-
-            fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
-            ax.fill(angles, averages, color='blue', alpha=0.25)
-            ax.plot(angles, averages, color='blue', linewidth=2)
-            ax.set_yticks([])
-            ax.set_xticks(angles[:-1])
-            ax.set_xticklabels(labels)
-            ax.set_title("Athletic Performance Radar Analysis", y=1.1)
-
-        elif graph_type == "BMI Distribution Analysis":
-            # Verilerin 'physical_data' içinden alınması
-            height_values = [convert_height_to_float(data['heights']) for data in physical_data]
-            weight_values = [data['weight'] for data in physical_data]
-
-            # BMI Hesaplama
-            bmi_values = [weight / (height ** 2) for weight, height in zip(weight_values, height_values)]
-
-            # BMI Dağılımı - Histogram
-            plt.hist(bmi_values, bins=10, color='royalblue', edgecolor='black', alpha=0.9)
-            plt.title('BMI Distribution (Histogram)', fontsize=16, fontweight='bold')
-            plt.xlabel('BMI', fontsize=14)
-            plt.ylabel('Frequency', fontsize=14)
-            plt.grid(axis='y', alpha=0.75)
-            plt.xticks(fontsize=12)
-            plt.yticks(fontsize=12)
-
-        elif graph_type == "Comprehensive Physical Metrics Box Plot":
-            # Verileri 'physical_data' içinden alıyoruz
-            muscle_mass_values = [data['muscle_mass'] for data in physical_data]
-            muscle_strength_values = [data['muscle_strength'] for data in physical_data]
-            muscle_endurance_values = [data['muscle_endurance'] for data in physical_data]
-            flexibility_values = [data['flexibility'] for data in physical_data]
-            weight_values = [data['weight'] for data in physical_data]
-            height_values = [convert_height_to_float(data['heights']) for data in physical_data]
-
-            # BMI hesaplama: BMI = Ağırlık / (Boy * Boy)
-            bmi_values = [weight / (height ** 2) for weight, height in zip(weight_values, height_values)]
-            
-            # Box plot çizimi: Kas kütlesi, kas gücü, kas dayanıklılığı, esneklik ve BMI verilerini birleştiriyoruz
-            sns.boxplot(data=[muscle_mass_values, muscle_strength_values, muscle_endurance_values, flexibility_values, bmi_values], 
-                        palette="pastel", orient="h", width=0.4)
-            
-            # Grafik başlıkları ve etiketleri
-            plt.title('Physical Parameters Distribution (Box Plot)', fontsize=16, fontweight='bold')
-            
-            # Y eksenindeki etiketleri sağa kaydırma
-            plt.yticks(ticks=[0, 1, 2, 3, 4], labels=['Muscle Mass (kg)', 'Muscle Strength (kg)', 
-                                                        'Muscle Endurance (reps)', 'Flexibility (cm)', 'BMI'], 
-                    fontsize=12)
-            
-            # Y-label'leri sağa kaydırmak için labelpad parametresi kullanıyoruz
-            plt.ylabel('Physical Parameters', fontsize=14, labelpad=20)  # labelpad ile sağa kaydırma
-            
-            # X eksenindeki etiketler
-            plt.xlabel('Values', fontsize=14)
-
-        elif graph_type == "Dynamic Body Metrics Tracker":
-            thigh_circumference = [data['thigh_circumference'] for data in physical_data]
-            shoulder_circumference = [data['shoulder_circumference'] for data in physical_data]
-            arm_circumference = [data['arm_circumference'] for data in physical_data]
-            chest_circumference = [data['chest_circumference'] for data in physical_data]
-            back_circumference = [data['back_circumference'] for data in physical_data]
-            waist_circumference = [data['waist_circumference'] for data in physical_data]
-            leg_circumference = [data['leg_circumference'] for data in physical_data]
-            calf_circumference = [data['calf_circumference'] for data in physical_data]
-
-            plt.plot(days, thigh_circumference, label="Thigh Circumference")
-            plt.plot(days, shoulder_circumference, label="Shoulder Circumference")
-            plt.plot(days, arm_circumference, label="Arm Circumference")
-            plt.plot(days, chest_circumference, label="Chest Circumference")
-            plt.plot(days, back_circumference, label="Back Circumference")
-            plt.plot(days, waist_circumference, label="Waist Circumference")
-            plt.plot(days, leg_circumference, label="Leg Circumference")
-            plt.plot(days, calf_circumference, label="Calf Circumference")
-            plt.title("Dynamic Body Metrics Tracker")
-            plt.xlabel("Date")
-            plt.ylabel("Value (%)")
-
-            # Grafik üzerinde etiketler ve grid
-            plt.legend()
-            plt.grid(True)
-
-        else:
+        if not graph_catalog.is_supported('physical', graph_type):
             return jsonify({'error': f'Unknown graph type: {graph_type}'}), 400
 
+        # format=data: çizim yerine seriler döner, istemci grafiği kendisi çizer
+        if data.get('format') == 'data':
+            return jsonify(graph_series.build_series('physical', graph_type, physical_data)), 200
+
+        # output=image/base64: bellekte çizilir, diske yazılmaz ve ikinci istek gerekmez
+        output = data.get('output', 'file')
+        if output in ('image', 'base64'):
+            try:
+                image_format, dpi = graph_catalog.image_options(data.get('format'), data.get('dpi'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            image = graph_jobs.render_bytes('physical', graph_type, physical_data, image_format, dpi)
+            mimetype = graph_catalog.IMAGE_FORMATS[image_format]
+            if output == 'image':
+                return Response(image, mimetype=mimetype), 200
+            return jsonify({
+                'format': image_format,
+                'mimetype': mimetype,
+                'image': base64.b64encode(image).decode('ascii')
+            }), 200
+        if output != 'file':
+            return jsonify({'error': f'Unknown output: {output}. Use file, image or base64'}), 400
 
         # Statik klasöre kaydet
         static_dir = os.path.join(current_app.root_path, 'static', 'graphs', 'physical_graphs')
         os.makedirs(static_dir, exist_ok=True)
-        file_name = f"{footballer_id}_{graph_type.replace(' ', '_')}_{start_date}_{end_date}.png"
+        file_name = graph_cache.graph_file_name('physical', graph_type, footballer_id, start_date, end_date, physical_data)
         file_path = os.path.join(static_dir, file_name)
-        plt.savefig(file_path)
-        plt.close()
+        relative_path = f'/static/graphs/physical_graphs/{file_name}'
+
+        # Aynı verilerle daha önce çizildiyse tekrar çizme
+        if graph_cache.lookup(file_path):
+            return jsonify({'message': 'Graph generated', 'path': relative_path, 'cached': True}), 200
+
+        if data.get('async'):
+            job_id = graph_jobs.submit(request.user_id, 'physical', graph_type, physical_data, file_path, relative_path)
+            return jsonify({
+                'message': 'Graph job queued',
+                'job_id': job_id,
+                'status_url': f'/api/physical/graph-jobs/{job_id}'
+            }), 202
+
+        # Render worker process'te yapılır (CPU yoğun, API process'inin GIL'ini tutmasın)
+        graph_jobs.render('physical', graph_type, physical_data, file_path)
 
         # Dosya gerçekten oluşturuldu mu kontrol et
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Graph file not found at {file_path}")
 
         # Ön uç için göreceli yol döndür
-        relative_path = f'/static/graphs/physical_graphs/{file_name}'
         return jsonify({'message': 'Graph generated', 'path': relative_path}), 200
 
     except Exception as e:
@@ -518,9 +425,67 @@ def generate_graph():
         print("Error during graph generation:", str(e))
         return jsonify({'error': str(e)}), 500
 
-    finally:
-        # Bağlantıyı kapat
-        db.close(session)
+@physical_bp.route('/graph-jobs/<job_id>', methods=['GET'])
+@token_required
+def get_graph_job(job_id):
+    """Get the status of a queued graph render."""
+    job = graph_jobs.get_job(
+        job_id, request.user_id, domain='physical',
+        output_dir=os.path.join(current_app.root_path, 'static', 'graphs', 'physical_graphs'),
+        output_url='/static/graphs/physical_graphs'
+    )
+    if not job:
+        return jsonify({'error': 'Graph job not found'}), 404
+    return jsonify(job), 200
+
+@physical_bp.route('/generate-dashboard', methods=['POST'])
+@token_required
+@footballer_access_required
+def generate_dashboard():
+    """Generate several graphs of a footballer in one request.
+
+    Body: footballer_id, start_date, end_date and graph_types (every physical
+    graph if omitted). The data is loaded once and missing graphs are
+    rendered in parallel. Each graph comes back as a path like
+    /generate-graph, as series with "format": "data", or inline with
+    "output": "base64" ("format"/"dpi" as in /generate-graph). A graph that
+    fails has an "error" field.
+    """
+    data = request.json or {}
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    footballer_id = data.get('footballer_id')
+
+    session = get_session()
+
+    try:
+        graph_types = graph_dashboard.graph_types_arg('physical', data.get('graph_types'))
+        output, image_format, dpi = graph_dashboard.output_options(data)
+
+        # Tüm grafikler için veriler tek sorguda alınır
+        service = PhysicalService(session)
+        physical_data = service.get_physical_data(
+            footballer_id,
+            start_date=start_date,
+            end_date=end_date,
+            fields=graph_dashboard.dashboard_fields('physical', graph_types)
+        )
+        if not physical_data:
+            return jsonify({'error': 'No data available for the selected criteria'}), 404
+
+        static_dir = os.path.join(current_app.root_path, 'static', 'graphs', 'physical_graphs')
+        os.makedirs(static_dir, exist_ok=True)
+        graphs = graph_dashboard.build(
+            'physical', graph_types, physical_data, footballer_id, start_date, end_date,
+            static_dir, '/static/graphs/physical_graphs', output, image_format, dpi
+        )
+        return jsonify({'footballer_id': footballer_id, 'graphs': graphs}), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print("Error during dashboard generation:", str(e))
+        return jsonify({'error': str(e)}), 500
 
 @physical_bp.route('/debug/user-access/<team_id>', methods=['GET'])
 @token_required
@@ -528,7 +493,7 @@ def debug_user_access(team_id):
     """Debug endpoint to check user access to a specific team"""
     from services.authorization_service import AuthorizationService
     
-    session = db.connect()
+    session = get_session()
     try:
         auth_service = AuthorizationService(session)
         user = auth_service.get_user_by_id(request.user_id)
@@ -552,6 +517,4 @@ def debug_user_access(team_id):
         return jsonify(debug_info), 200
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        db.close(session)
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
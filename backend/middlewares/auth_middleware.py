@@ -2,7 +2,10 @@ from itsdangerous import URLSafeTimedSerializer as Serializer
 from itsdangerous.exc import BadSignature, BadTimeSignature, SignatureExpired
 from flask import request, jsonify
 from functools import wraps
+from utils.cache import TTLCache
+import hashlib
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,29 +17,82 @@ serializer = Serializer(
 
 EXPIRATION_SECONDS = int(os.getenv('JWT_EXPIRATION', 86400))
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
+# sha256(token) -> (claims, expires_at); skips HMAC verification for recently seen tokens
+verified_tokens = TTLCache(
+    maxsize=int(os.getenv('TOKEN_CACHE_SIZE', 4096)),
+    ttl=int(os.getenv('TOKEN_CACHE_TTL', 300))
+)
 
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+OUTDATED_TOKEN_MESSAGE = 'Token is outdated, please log in again!'
 
-        if not token:
-            return jsonify({'message': 'Token is missing!'}), 401
+def _claims_are_current(auth_service):
+    """Check whether the token's role/team/admin claims can be trusted.
 
-        try:
-            data = serializer.loads(token, max_age=EXPIRATION_SECONDS)
-            request.user_id = data['user_id']
-            request.user_role = data['role']
-            request.user_team_id = data.get('team_id')
-            request.is_admin = data.get('is_admin', False)
-        except SignatureExpired:
-            return jsonify({'message': 'Token has expired!'}), 401
-        except (BadSignature, BadTimeSignature):
-            return jsonify({'message': 'Invalid token!'}), 401
+    Returns None for tokens issued before versioning was introduced; callers
+    then fall back to database-backed checks.
+    """
+    token_version = getattr(request, 'token_version', None)
+    if token_version is None:
+        return None
+    return auth_service.is_token_current(request.user_id, token_version)
+
+def _decode_token(token):
+    """Verify a token and return its claims, served from the cache when possible.
+
+    Raises SignatureExpired / BadSignature like serializer.loads.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    cached = verified_tokens.get(key)
+    if cached is not None:
+        data, expires_at = cached
+        if time.time() < expires_at:
+            return data
+        verified_tokens.invalidate(key)
+        raise SignatureExpired('Token has expired')
+
+    data, issued_at = serializer.loads(token, max_age=EXPIRATION_SECONDS, return_timestamp=True)
+    verified_tokens.set(key, (data, issued_at.timestamp() + EXPIRATION_SECONDS))
+    return data
+
+def _authenticate():
+    """Verify the bearer token once per request and expose its claims on request.
+
+    Returns None on success or an error response tuple.
+    """
+    if getattr(request, 'token_verified', False):
+        return None
+
+    token = None
+
+    if 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        if auth_header.startswith('Bearer '):
+            token = auth_header.split(' ')[1]
+
+    if not token:
+        return jsonify({'message': 'Token is missing!'}), 401
+
+    try:
+        data = _decode_token(token)
+        request.user_id = data['user_id']
+        request.user_role = data['role']
+        request.user_team_id = data.get('team_id')
+        request.is_admin = data.get('is_admin', False)
+        request.token_version = data.get('token_version')
+    except SignatureExpired:
+        return jsonify({'message': 'Token has expired!'}), 401
+    except (BadSignature, BadTimeSignature):
+        return jsonify({'message': 'Invalid token!'}), 401
+
+    request.token_verified = True
+    return None
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        error = _authenticate()
+        if error:
+            return error
 
         return f(*args, **kwargs)
     return decorated
@@ -44,9 +100,15 @@ def token_required(f):
 def coach_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token_verify = token_required(lambda: None)()
-        if isinstance(token_verify, tuple) and token_verify[1] != 200:
-            return token_verify
+        error = _authenticate()
+        if error:
+            return error
+
+        from utils.database import get_session
+        from services.authorization_service import AuthorizationService
+
+        if _claims_are_current(AuthorizationService(get_session())) is False:
+            return jsonify({'message': OUTDATED_TOKEN_MESSAGE}), 401
 
         if request.user_role != 'coach':
             return jsonify({'message': 'Coach access required!'}), 403
@@ -59,7 +121,7 @@ def team_access_required(f):
     """Decorator to check if user has access to the requested team."""
     @wraps(f)
     def decorated(*args, **kwargs):
-        from utils.database import Database
+        from utils.database import get_session
         from services.authorization_service import AuthorizationService
         
         # URL'den team_id'yi al (Flask URL parametresi)
@@ -74,22 +136,29 @@ def team_access_required(f):
         except (ValueError, TypeError):
             return jsonify({'error': 'Invalid team ID format. Must be an integer.'}), 400
             
-        # Authorization check
-        db = Database()
-        session = db.connect()
+        # Authorization check (request-scoped session, reused by the view)
         try:
-            auth_service = AuthorizationService(session)
+            auth_service = AuthorizationService(get_session())
             user_id = getattr(request, 'user_id', None)
             
             if not user_id:
                 return jsonify({'message': 'User not authenticated!'}), 401
                 
-            # User.team_id ile karşılaştırma yap
-            can_access = auth_service.can_access_team(user_id, team_id_int)
+            claims_current = _claims_are_current(auth_service)
+            if claims_current is False:
+                return jsonify({'message': OUTDATED_TOKEN_MESSAGE}), 401
+            
+            if claims_current:
+                # Token claims are authoritative while their version is current
+                user_team_id = request.user_team_id
+                can_access = request.is_admin or user_team_id == team_id_int
+            else:
+                # User.team_id ile karşılaştırma yap
+                can_access = auth_service.can_access_team(user_id, team_id_int)
+                access = auth_service.get_user_access(user_id)
+                user_team_id = access.team_id if access else None
+            
             if not can_access:
-                # Daha detaylı hata mesajı için user bilgisini al
-                user = auth_service.get_user_by_id(user_id)
-                user_team_id = user.team_id if user else None
                 return jsonify({
                     'message': 'Access denied! You can only access your assigned team.',
                     'user_team_id': user_team_id,
@@ -102,8 +171,6 @@ def team_access_required(f):
                 'error': f'Authorization error: {str(e)}',
                 'traceback': traceback.format_exc()
             }), 500
-        finally:
-            db.close(session)
             
         return f(*args, **kwargs)
     return decorated
@@ -112,26 +179,38 @@ def footballer_access_required(f):
     """Decorator to check if user has access to the requested footballer."""
     @wraps(f)
     def decorated(*args, **kwargs):
-        from utils.database import Database
+        from utils.database import get_session
         from services.authorization_service import AuthorizationService
         
         # Get footballer_id from URL parameters or request data
-        footballer_id = kwargs.get('footballer_id') or request.json.get('footballer_id') if request.json else None
+        footballer_id = kwargs.get('footballer_id')
+        if not footballer_id:
+            body = request.get_json(silent=True) or {}
+            footballer_id = body.get('footballer_id')
         
         if not footballer_id:
             return jsonify({'message': 'Footballer ID is required!'}), 400
         
-        # Check authorization
-        db = Database()
-        session = db.connect()
+        # Check authorization (request-scoped session, reused by the view)
         try:
-            auth_service = AuthorizationService(session)
-            if not auth_service.can_access_footballer(request.user_id, int(footballer_id)):
+            auth_service = AuthorizationService(get_session())
+            claims_current = _claims_are_current(auth_service)
+            if claims_current is False:
+                return jsonify({'message': OUTDATED_TOKEN_MESSAGE}), 401
+            
+            if claims_current:
+                # Token claims are authoritative while their version is current
+                footballer_team_id = None if request.is_admin else auth_service.get_footballer_team_id(int(footballer_id))
+                can_access = request.is_admin or (
+                    footballer_team_id is not None and footballer_team_id == request.user_team_id
+                )
+            else:
+                can_access = auth_service.can_access_footballer(request.user_id, int(footballer_id))
+            
+            if not can_access:
                 return jsonify({'message': 'Access denied! You can only access footballers from your assigned team.'}), 403
         except Exception as e:
             return jsonify({'error': str(e)}), 500
-        finally:
-            db.close(session)
         
         return f(*args, **kwargs)
     
@@ -0,0 +1,2 @@
+-- Token version used to invalidate outstanding tokens after role/team/admin changes
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,5 @@
+-- Composite indexes for per-footballer date range, by-date and history queries
+-- CONCURRENTLY avoids blocking writes; run outside a transaction (psql -f does by default)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_physical_footballer_id_created_at ON physical (footballer_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conditional_footballer_id_created_at ON conditional (footballer_id, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_endurance_footballer_id_created_at ON endurance (footballer_id, created_at);
@@ -0,0 +1,24 @@
+-- One physical/conditional/endurance entry per footballer per day, enforced by
+-- the database and used as the INSERT ... ON CONFLICT target of the services.
+-- Run outside a transaction (psql -f does by default) because of CONCURRENTLY.
+--
+-- The unique indexes fail to build if duplicates already exist; list them with e.g.
+--   SELECT footballer_id, created_at::date, count(*) FROM physical
+--   GROUP BY 1, 2 HAVING count(*) > 1;
+-- and merge or delete them before re-running.
+
+ALTER TABLE physical ADD COLUMN IF NOT EXISTS entry_date DATE;
+UPDATE physical SET entry_date = created_at::date WHERE entry_date IS NULL;
+ALTER TABLE physical ALTER COLUMN entry_date SET NOT NULL;
+
+ALTER TABLE conditional ADD COLUMN IF NOT EXISTS entry_date DATE;
+UPDATE conditional SET entry_date = created_at::date WHERE entry_date IS NULL;
+ALTER TABLE conditional ALTER COLUMN entry_date SET NOT NULL;
+
+ALTER TABLE endurance ADD COLUMN IF NOT EXISTS entry_date DATE;
+UPDATE endurance SET entry_date = created_at::date WHERE entry_date IS NULL;
+ALTER TABLE endurance ALTER COLUMN entry_date SET NOT NULL;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_physical_footballer_id_entry_date ON physical (footballer_id, entry_date);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_conditional_footballer_id_entry_date ON conditional (footballer_id, entry_date);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_endurance_footballer_id_entry_date ON endurance (footballer_id, entry_date);
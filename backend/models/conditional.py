@@ -1,10 +1,16 @@
 # backend/models/conditional.py
-from sqlalchemy import Column, Integer, Float, ForeignKey, TIMESTAMP
-from utils.database import Base
+from sqlalchemy import Column, Date, Index, UniqueConstraint, Integer, Float, ForeignKey, TIMESTAMP
+from utils.database import Base, entry_date_default
 from datetime import datetime
 
 class Conditional(Base):
     __tablename__ = 'conditional'
+    __table_args__ = (
+        # Footballer + date range / history queries
+        Index('ix_conditional_footballer_id_created_at', 'footballer_id', 'created_at'),
+        # One entry per footballer per day (upsert conflict target)
+        UniqueConstraint('footballer_id', 'entry_date', name='uq_conditional_footballer_id_entry_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     footballer_id = Column(Integer, ForeignKey('footballers.footballer_id'), nullable=False)
@@ -20,6 +26,7 @@ class Conditional(Base):
     target_muscle_strength = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
     timestamp = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    entry_date = Column(Date, default=entry_date_default, nullable=False)
 
     def __init__(self, footballer_id, vo2_max=None, lactate_levels=None, training_intensity=None, recovery_times=None,
                  current_vo2_max=None, current_lactate_levels=None, current_muscle_strength=None, 
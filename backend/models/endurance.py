@@ -1,10 +1,16 @@
 # backend/models/endurance.py
-from sqlalchemy import Column, Integer, Float, ForeignKey, TIMESTAMP
-from utils.database import Base
+from sqlalchemy import Column, Date, Index, UniqueConstraint, Integer, Float, ForeignKey, TIMESTAMP
+from utils.database import Base, entry_date_default
 from datetime import datetime
 
 class Endurance(Base):
     __tablename__ = 'endurance'
+    __table_args__ = (
+        # Footballer + date range / history queries
+        Index('ix_endurance_footballer_id_created_at', 'footballer_id', 'created_at'),
+        # One entry per footballer per day (upsert conflict target)
+        UniqueConstraint('footballer_id', 'entry_date', name='uq_endurance_footballer_id_entry_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     footballer_id = Column(Integer, ForeignKey('footballers.footballer_id'), nullable=False)
@@ -16,6 +22,7 @@ class Endurance(Base):
     session = Column(Integer, nullable=True)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
     timestamp = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    entry_date = Column(Date, default=entry_date_default, nullable=False)
 
     def __init__(self, footballer_id, running_distance=None, average_speed=None, heart_rate=None, 
                  peak_heart_rate=None, training_intensity=None, session=None):
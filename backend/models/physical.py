@@ -1,10 +1,16 @@
 # backend/models/physical.py
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, TIMESTAMP
-from utils.database import Base
+from sqlalchemy import Column, Date, Index, UniqueConstraint, Integer, Float, String, ForeignKey, TIMESTAMP
+from utils.database import Base, entry_date_default
 from datetime import datetime
 
 class Physical(Base):
     __tablename__ = 'physical'
+    __table_args__ = (
+        # Footballer + date range / history queries
+        Index('ix_physical_footballer_id_created_at', 'footballer_id', 'created_at'),
+        # One entry per footballer per day (upsert conflict target)
+        UniqueConstraint('footballer_id', 'entry_date', name='uq_physical_footballer_id_entry_date'),
+    )
 
     id = Column(Integer, primary_key=True)
     footballer_id = Column(Integer, ForeignKey('footballers.footballer_id'), nullable=False)
@@ -25,6 +31,7 @@ class Physical(Base):
     calf_circumference = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
     timestamp = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
+    entry_date = Column(Date, default=entry_date_default, nullable=False)
 
     def __init__(self, footballer_id, muscle_mass=None, muscle_strength=None, muscle_endurance=None, flexibility=None, 
                  weight=None, body_fat_percentage=None, heights=None, thigh_circumference=None, 
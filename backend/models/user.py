@@ -26,6 +26,8 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     needs_password_change = Column(Boolean, default=False)
+    # Bumped whenever role/team/admin change so previously issued tokens stop being trusted
+    token_version = Column(Integer, nullable=False, default=0)
     
     # The relationship with FootballTeam is defined in FootballTeam with backref
     # We do not need to explicitly define it here
@@ -43,4 +45,5 @@ class User(Base):
         self.team_id = team_id
         self.access_key = access_key
         self.is_admin = is_admin
-        self.needs_password_change = needs_password_change
\ No newline at end of file
+        self.needs_password_change = needs_password_change
+        self.token_version = 0
\ No newline at end of file
@@ -4,19 +4,27 @@ from datetime import datetime, timedelta
 from werkzeug.security import check_password_hash, generate_password_hash
 from models.user import User
 from models.football_team import FootballTeam
-from utils.database import Database
+from services.authorization_service import invalidate_user_access
+from sqlalchemy.orm import Session
+
+# Token claims whose change bumps token_version, with their column types
+PERMISSION_FIELDS = {'role': str, 'team_id': int, 'is_admin': bool}
+
+def _permission_changed(current, value, field_type):
+    # JSON'dan gelen "2" ile kayıtlı 2 aynı takımdır
+    if current is None or value is None:
+        return current != value
+    try:
+        return field_type(value) != current
+    except (TypeError, ValueError):
+        return True
 
 class AuthService:
-    def __init__(self):
-        self.db = Database()
-        self.session = self.db.connect()
+    def __init__(self, session: Session):
+        self.session = session
         self.secret_key = os.getenv('SECRET_KEY')
         self.salt = os.getenv('SECURITY_PASSWORD_SALT', 'default_salt')
         self.serializer = Serializer(self.secret_key, salt=self.salt)
-
-    def __del__(self):
-        if self.session:
-            self.db.close(self.session)
     
     def login_user(self, username, password):
         user = self.session.query(User).filter(User.username == username).first()
@@ -24,12 +32,13 @@ class AuthService:
         if not user:
             return None, "User not found"
         
+        # Counters are incremented in SQL so concurrent logins do not lose updates
         if not check_password_hash(user.password, password):
-            user.wrong_login_attempt += 1
+            user.wrong_login_attempt = User.wrong_login_attempt + 1
             self.session.commit()
             return None, "Invalid password"
         
-        user.login_attempt += 1
+        user.login_attempt = User.login_attempt + 1
         user.is_now_login = 'yes'
         user.wrong_login_attempt = 0
         self.session.commit()
@@ -159,16 +168,29 @@ class AuthService:
         if not user:
             return None, "User not found"
         
+        # Validate before touching the user so a rejected update changes nothing
+        if 'email' in data and data['email'] != user.email:
+            existing_email = self.session.query(User).filter(User.email == data['email']).first()
+            if existing_email:
+                return None, "Email already exists"
+        if 'password' in data and data['password']:
+            if 'current_password' not in data or not check_password_hash(user.password, data['current_password']):
+                return None, "Current password is incorrect"
+
         if 'firstname' in data:
             user.firstname = data['firstname']
         if 'lastname' in data:
             user.lastname = data['lastname']
         if 'email' in data:
-            if data['email'] != user.email:
-                existing_email = self.session.query(User).filter(User.email == data['email']).first()
-                if existing_email:
-                    return None, "Email already exists"
             user.email = data['email']
+        # Permission changes invalidate tokens carrying the old claims
+        permissions_changed = any(
+            field in data and _permission_changed(getattr(user, field), data[field], field_type)
+            for field, field_type in PERMISSION_FIELDS.items()
+        )
+        if permissions_changed:
+            user.token_version = (user.token_version or 0) + 1
+        
         if 'role' in data:
             user.role = data['role']
         if 'club' in data:
@@ -183,14 +205,14 @@ class AuthService:
             user.needs_password_change = data['needs_password_change']
         
         if 'password' in data and data['password']:
-            if 'current_password' not in data or not check_password_hash(user.password, data['current_password']):
-                return None, "Current password is incorrect"
             user.old_password = user.password
             user.password = generate_password_hash(data['password'])
         
         try:
             self.session.commit()
-            return {
+            if permissions_changed:
+                invalidate_user_access(user_id)
+            result = {
                 'id': user.id,
                 'username': user.username,
                 'email': user.email,
@@ -202,7 +224,11 @@ class AuthService:
                 'access_key': user.access_key,
                 'is_admin': user.is_admin,
                 'needs_password_change': user.needs_password_change
-            }, "User updated successfully"
+            }
+            if permissions_changed:
+                # The caller's old token is no longer accepted, hand out a fresh one
+                result['token'] = self._generate_token(user)
+            return result, "User updated successfully"
         except Exception as e:
             self.session.rollback()
             return None, str(e)
@@ -223,7 +249,8 @@ class AuthService:
                 'role': user.role,
                 'club': user.club,
                 'team_id': user.team_id,
-                'is_admin': user.is_admin
+                'is_admin': user.is_admin,
+                'token_version': user.token_version or 0
             }
             token = self.serializer.dumps(payload)
             return token
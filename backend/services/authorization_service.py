@@ -3,6 +3,30 @@ from models.user import User
 from models.football_team import FootballTeam
 from models.footballer import Footballer
 from sqlalchemy.orm import Session
+from utils.cache import TTLCache
+import os
+
+# In-process caches so authorization is a dictionary lookup on the hot path:
+# user_id -> UserAccess, footballer_id -> team_id. The API never moves a
+# footballer to another team (the footballers table is maintained outside it),
+# so a changed team is picked up when the entry expires after AUTHZ_CACHE_TTL.
+_CACHE_TTL = int(os.getenv('AUTHZ_CACHE_TTL', 60))
+_CACHE_SIZE = int(os.getenv('AUTHZ_CACHE_SIZE', 4096))
+user_access_cache = TTLCache(maxsize=_CACHE_SIZE, ttl=_CACHE_TTL)
+footballer_team_cache = TTLCache(maxsize=_CACHE_SIZE, ttl=_CACHE_TTL)
+
+def invalidate_user_access(user_id):
+    """Forget cached permissions of a user (call after team_id/is_admin changes)."""
+    user_access_cache.invalidate(int(user_id))
+
+class UserAccess:
+    """Authorization-relevant fields of a user."""
+    __slots__ = ('is_admin', 'team_id', 'token_version')
+
+    def __init__(self, is_admin, team_id, token_version=0):
+        self.is_admin = bool(is_admin)
+        self.team_id = int(team_id) if team_id is not None else None
+        self.token_version = token_version or 0
 
 class AuthorizationService:
     def __init__(self, session: Session):
@@ -11,53 +35,103 @@ class AuthorizationService:
     def get_user_by_id(self, user_id):
         """Get user by ID."""
         return self.session.query(User).filter(User.id == user_id).first()
+
+    def get_user_access(self, user_id):
+        """Get the cached (is_admin, team_id) of a user, or None if not found."""
+        def load():
+            row = self.session.query(User.is_admin, User.team_id, User.token_version).filter(User.id == user_id).first()
+            return UserAccess(row.is_admin, row.team_id, row.token_version) if row else None
+        return user_access_cache.get_or_load(int(user_id), load)
+
+    def is_token_current(self, user_id, token_version):
+        """Check that claims signed with token_version still match the user's permissions.
+
+        The cache is per process: a token newer than the cached version was
+        issued after an update handled by another worker, so the user is
+        reloaded before deciding. An older token stays accepted there until
+        the cached entry expires (AUTHZ_CACHE_TTL).
+        """
+        access = self.get_user_access(user_id)
+        if access is not None and token_version > access.token_version:
+            invalidate_user_access(user_id)
+            access = self.get_user_access(user_id)
+        return access is not None and access.token_version == token_version
+
+    def get_footballer_team_id(self, footballer_id):
+        """Get the cached team_id of a footballer, or None if not found."""
+        def load():
+            row = self.session.query(Footballer.team_id).filter(Footballer.footballer_id == footballer_id).first()
+            return row.team_id if row else None
+        return footballer_team_cache.get_or_load(int(footballer_id), load)
         
+    def get_footballer_team_ids(self, footballer_ids):
+        """Get {footballer_id: team_id} for many footballers with at most one query.
+
+        Unknown footballers are left out of the result.
+        """
+        team_ids = {}
+        missing = []
+        for footballer_id in {int(footballer_id) for footballer_id in footballer_ids}:
+            team_id = footballer_team_cache.get(footballer_id)
+            if team_id is None:
+                missing.append(footballer_id)
+            else:
+                team_ids[footballer_id] = team_id
+
+        if missing:
+            rows = self.session.query(Footballer.footballer_id, Footballer.team_id).filter(
+                Footballer.footballer_id.in_(missing)
+            ).all()
+            for row in rows:
+                footballer_team_cache.set(row.footballer_id, row.team_id)
+                team_ids[row.footballer_id] = row.team_id
+        return team_ids
+
+    def can_access_footballers(self, user_id, footballer_ids):
+        """Check if user can access every footballer in footballer_ids."""
+        access = self.get_user_access(user_id)
+        if not access:
+            return False
+
+        requested = {int(footballer_id) for footballer_id in footballer_ids}
+        team_ids = self.get_footballer_team_ids(requested)
+        if len(team_ids) != len(requested):
+            return False
+
+        return access.is_admin or all(team_id == access.team_id for team_id in team_ids.values())
+
     def can_access_team(self, user_id, team_id):
         """Check if user can access a specific team."""
-        print(f"DEBUG: can_access_team called with user_id={user_id}, team_id={team_id}")
-        
-        user = self.get_user_by_id(user_id)
-        if not user:
-            print(f"DEBUG: User {user_id} not found")
+        access = self.get_user_access(user_id)
+        if not access:
             return False
         
-        print(f"DEBUG: User found: id={user.id}, team_id={user.team_id}, is_admin={user.is_admin}")
-        
         # Admin users can access all teams
-        if user.is_admin:
-            print(f"DEBUG: User is admin, access granted")
+        if access.is_admin:
             return True
         
         # Regular users can only access their assigned team
         try:
-            # Convert both to strings for comparison to avoid type issues
-            user_team_id = int(user.team_id) if user.team_id is not None else None
             requested_team_id = int(team_id) if team_id is not None else None
-            
-            result = user_team_id == requested_team_id
-            print(f"DEBUG: Regular user access check: {user_team_id} == {requested_team_id} = {result}")
-            return result
-        except Exception as e:
-            print(f"DEBUG: Error comparing team_ids: {e}")
+            return access.team_id == requested_team_id
+        except (ValueError, TypeError):
             return False
 
     def can_access_footballer(self, user_id, footballer_id):
         """Check if user can access a specific footballer."""
-        user = self.get_user_by_id(user_id)
-        if not user:
+        access = self.get_user_access(user_id)
+        if not access:
             return False
         
         # Admin users can access all footballers
-        if user.is_admin:
+        if access.is_admin:
             return True
         
-        # Get footballer's team
-        footballer = self.session.query(Footballer).filter(Footballer.footballer_id == footballer_id).first()
-        if not footballer:
-            return False
-        
         # Check if user's team matches footballer's team
-        return user.team_id == footballer.team_id
+        footballer_team_id = self.get_footballer_team_id(footballer_id)
+        if footballer_team_id is None:
+            return False
+        return access.team_id == footballer_team_id
 
     def get_user_accessible_teams(self, user_id):
         """Get all teams that user can access."""
@@ -1,16 +1,29 @@
 # backend/services/conditional_service.py
 from datetime import datetime
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
 from models.league import League
 from models.football_team import FootballTeam
 from models.footballer import Footballer
 from models.conditional import Conditional
-from models.user import User
+from services.authorization_service import AuthorizationService
+from utils.database import upsert_rows
+from utils.pagination import keyset_page
+from utils.serialization import serialize_rows, date_string, datetime_or_now, float_or_zero
+from services import metric_ingest, metric_export, graph_series
 from sqlalchemy.orm import Session
 
 class ConditionalService:
+    # Columns written by add/bulk add; also updated on upsert conflicts
+    METRIC_FIELDS = (
+        'vo2_max', 'lactate_levels', 'training_intensity', 'recovery_times',
+        'current_vo2_max', 'current_lactate_levels', 'current_muscle_strength',
+        'target_vo2_max', 'target_lactate_level', 'target_muscle_strength'
+    )
+    FLOAT_FIELDS = dict.fromkeys(METRIC_FIELDS, float_or_zero)
+
     def __init__(self, session: Session):
         self.session = session
+        self.authorization = AuthorizationService(session)
 
     def get_all_leagues(self):
         """Get all leagues available in the database."""
@@ -20,7 +33,7 @@ class ConditionalService:
     def get_teams_by_league(self, league_id, user_id=None):
         """Get all teams in a specific league that user can access."""
         if user_id:
-            user = self.session.query(User).filter(User.id == user_id).first()
+            user = self.authorization.get_user_access(user_id)
             if user and not user.is_admin and user.team_id:
                 # Non-admin users can only see their assigned team
                 teams = self.session.query(FootballTeam).filter(
@@ -46,7 +59,7 @@ class ConditionalService:
 
             # Check user permissions if user_id is provided
             if user_id:
-                user = self.session.query(User).filter(User.id == user_id).first()
+                user = self.authorization.get_user_access(user_id)
                 if user and not user.is_admin:
                     # Handle case where user has no team assigned
                     if user.team_id is None:
@@ -91,7 +104,7 @@ class ConditionalService:
 
     def can_access_entry(self, user_id, entry_id):
         """Check if user can access a specific conditional data entry."""
-        user = self.session.query(User).filter(User.id == user_id).first()
+        user = self.authorization.get_user_access(user_id)
         if not user:
             return False
         
@@ -104,64 +117,74 @@ class ConditionalService:
         if not entry:
             return False
         
-        # Get footballer's team
-        footballer = self.session.query(Footballer).filter(Footballer.footballer_id == entry.footballer_id).first()
-        if not footballer:
-            return False
-        
         # Check if user's team matches footballer's team
-        return user.team_id == footballer.team_id
+        footballer_team_id = self.authorization.get_footballer_team_id(entry.footballer_id)
+        if footballer_team_id is None:
+            return False
+        return user.team_id == footballer_team_id
 
-    def get_conditional_data(self, footballer_id, graph_type=None, start_date=None, end_date=None):
-        """Get conditional data for a footballer within a date range."""
-        try:
-            query = self.session.query(Conditional).filter(Conditional.footballer_id == footballer_id)
-            
-            if start_date and end_date:
-                # Parse dates if they are strings
+    def _data_columns(self, graph_type=None, fields=None):
+        """Columns to load: the requested fields, else the ones graph_type draws, else all."""
+        if fields:
+            unknown = [field for field in fields if field not in self.METRIC_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            # Tekrarlanan alanlar bir kez, METRIC_FIELDS sırasıyla yüklenir
+            names = [field for field in self.METRIC_FIELDS if field in fields]
+        else:
+            names = graph_series.graph_fields('conditional', graph_type) or self.METRIC_FIELDS
+        return self._entry_columns(names)
+
+    def _data_query(self, footballer_id, start_date=None, end_date=None, graph_type=None, fields=None):
+        # Read-only: plain row tuples, no ORM entities. Raises ValueError for
+        # unknown fields or malformed dates (the controllers answer 400).
+        query = select(*self._data_columns(graph_type, fields)).where(Conditional.footballer_id == footballer_id)
+        if start_date and end_date:
+            # Parse dates if they are strings
+            try:
                 if isinstance(start_date, str):
                     start_date = datetime.strptime(start_date, '%Y-%m-%d')
                 if isinstance(end_date, str):
                     end_date = datetime.strptime(end_date, '%Y-%m-%d')
-                    
-                query = query.filter(Conditional.created_at.between(start_date, end_date))
-            
+            except ValueError:
+                raise ValueError('start_date and end_date must be dates in YYYY-MM-DD format')
+            query = query.where(Conditional.created_at.between(start_date, end_date))
+        return query
+
+    def get_conditional_data(self, footballer_id, graph_type=None, start_date=None, end_date=None, fields=None):
+        """Get conditional data for a footballer within a date range.
+
+        Only the columns graph_type draws (or the given fields) are loaded.
+        """
+        query = self._data_query(footballer_id, start_date, end_date, graph_type, fields)
+        try:
             # Order by date
             query = query.order_by(Conditional.created_at)
             
-            results = query.all()
-            
             # Convert to list of dictionaries
-            formatted_results = []
-            for result in results:
-                try:
-                    formatted_result = {
-                        'id': result.id,
-                        'footballer_id': result.footballer_id,
-                        'vo2_max': float(result.vo2_max) if result.vo2_max is not None else 0.0,
-                        'lactate_levels': float(result.lactate_levels) if result.lactate_levels is not None else 0.0,
-                        'training_intensity': float(result.training_intensity) if result.training_intensity is not None else 0.0,
-                        'recovery_times': float(result.recovery_times) if result.recovery_times is not None else 0.0,
-                        'current_vo2_max': float(result.current_vo2_max) if result.current_vo2_max is not None else 0.0,
-                        'current_lactate_levels': float(result.current_lactate_levels) if result.current_lactate_levels is not None else 0.0,
-                        'current_muscle_strength': float(result.current_muscle_strength) if result.current_muscle_strength is not None else 0.0,
-                        'target_vo2_max': float(result.target_vo2_max) if result.target_vo2_max is not None else 0.0,
-                        'target_lactate_level': float(result.target_lactate_level) if result.target_lactate_level is not None else 0.0,
-                        'target_muscle_strength': float(result.target_muscle_strength) if result.target_muscle_strength is not None else 0.0,
-                        'created_at': result.created_at if hasattr(result, 'created_at') and result.created_at else datetime.now()
-                    }
-                    formatted_results.append(formatted_result)
-                except Exception as e:
-                    print(f"Error formatting result: {str(e)}")
-                    # Skip problematic entries
-                    continue
-            
-            return formatted_results
+            return self._serialize(query, self.session.execute(query))
             
         except Exception as e:
             print(f"Error in get_conditional_data: {str(e)}")
             return []
 
+    def _serialize(self, query, rows):
+        # Metrics as floats (0.0 if missing), created_at left as a datetime
+        return serialize_rows(rows, query.selected_columns.keys(), created_at=datetime_or_now, **self.FLOAT_FIELDS)
+
+    def _serialize_history(self, query, rows):
+        return serialize_rows(rows, query.selected_columns.keys(), created_at=date_string)
+
+    def _entry_columns(self, fields=None):
+        names = ('id', 'footballer_id') + tuple(fields or self.METRIC_FIELDS) + ('created_at',)
+        return [getattr(Conditional, name) for name in names]
+
+    def get_conditional_data_page(self, footballer_id, page_size, cursor=None, start_date=None, end_date=None, fields=None):
+        """Get one keyset page of get_conditional_data (oldest first)."""
+        query = self._data_query(footballer_id, start_date, end_date, fields=fields)
+        rows, next_cursor = keyset_page(self.session, query, Conditional, page_size, cursor)
+        return {'items': self._serialize(query, rows), 'next_cursor': next_cursor}
+
     def get_conditional_entry_by_date(self, footballer_id, date):
         """Get conditional data for a footballer on a specific date."""
         try:
@@ -169,27 +192,14 @@ class ConditionalService:
             start_date = datetime.strptime(date, '%Y-%m-%d')
             end_date = datetime.strptime(date + ' 23:59:59', '%Y-%m-%d %H:%M:%S')
             
-            conditional_entry = self.session.query(Conditional).filter(
+            query = select(*self._entry_columns()).where(
                 Conditional.footballer_id == footballer_id,
                 Conditional.created_at.between(start_date, end_date)
-            ).first()
+            ).limit(1)
+            rows = self.session.execute(query).all()
             
-            if conditional_entry:
-                return {
-                    'id': conditional_entry.id,
-                    'footballer_id': conditional_entry.footballer_id,
-                    'vo2_max': conditional_entry.vo2_max,
-                    'lactate_levels': conditional_entry.lactate_levels,
-                    'training_intensity': conditional_entry.training_intensity,
-                    'recovery_times': conditional_entry.recovery_times,
-                    'current_vo2_max': conditional_entry.current_vo2_max,
-                    'current_lactate_levels': conditional_entry.current_lactate_levels,
-                    'current_muscle_strength': conditional_entry.current_muscle_strength,
-                    'target_vo2_max': conditional_entry.target_vo2_max,
-                    'target_lactate_level': conditional_entry.target_lactate_level,
-                    'target_muscle_strength': conditional_entry.target_muscle_strength,
-                    'created_at': conditional_entry.created_at.strftime('%Y-%m-%d') if conditional_entry.created_at else datetime.now().strftime('%Y-%m-%d')
-                }
+            if rows:
+                return self._serialize_history(query, rows)[0]
             
             return None
             
@@ -197,45 +207,59 @@ class ConditionalService:
             print(f"Error in get_conditional_entry_by_date: {str(e)}")
             return None
 
-    def add_conditional_data(self, footballer_id, data):
-        """Add new conditional data for a footballer."""
+    def add_conditional_data(self, footballer_id, data, upsert=False):
+        """Add today's conditional data for a footballer.
+
+        A single INSERT ... ON CONFLICT on (footballer_id, entry_date): an
+        existing entry for today is rejected, or overwritten with upsert=True.
+        """
         try:
-            # Check if entry already exists for today
-            today = datetime.now().strftime('%Y-%m-%d')
-            existing_entry = self.get_conditional_entry_by_date(footballer_id, today)
-            
-            if existing_entry:
-                return None, "Conditional data already exists for today. Please use update instead."
-            
-            # Create new conditional entry
-            new_entry = Conditional(
-                footballer_id=footballer_id,
-                vo2_max=data.get('vo2_max'),
-                lactate_levels=data.get('lactate_levels'),
-                training_intensity=data.get('training_intensity'),
-                recovery_times=data.get('recovery_times'),
-                current_vo2_max=data.get('current_vo2_max'),
-                current_lactate_levels=data.get('current_lactate_levels'),
-                current_muscle_strength=data.get('current_muscle_strength'),
-                target_vo2_max=data.get('target_vo2_max'),
-                target_lactate_level=data.get('target_lactate_level'),
-                target_muscle_strength=data.get('target_muscle_strength'),
+            created_at = datetime.utcnow()
+
+            values = {field: data.get(field) for field in self.METRIC_FIELDS}
+            values.update(
+                footballer_id=int(footballer_id),
+                created_at=created_at,
+                entry_date=created_at.date(),
+                timestamp=created_at
             )
-            
-            self.session.add(new_entry)
+            ids = upsert_rows(
+                self.session, Conditional, [values], ['footballer_id', 'entry_date'],
+                update_columns=self.METRIC_FIELDS + ('timestamp',) if upsert else None
+            )
+
+            if not ids:
+                return None, "Conditional data already exists for today. Please use update instead."
+
             self.session.commit()
-            
+
             return {
-                'id': new_entry.id,
-                'footballer_id': new_entry.footballer_id,
-                'created_at': new_entry.created_at.strftime('%Y-%m-%d') if new_entry.created_at else datetime.now().strftime('%Y-%m-%d')
+                'id': ids[0],
+                'footballer_id': values['footballer_id'],
+                'created_at': created_at.strftime('%Y-%m-%d')
             }, "Conditional data added successfully"
-            
+
         except Exception as e:
             self.session.rollback()
             print(f"Error in add_conditional_data: {str(e)}")
             return None, str(e)    
         
+    def add_conditional_data_bulk(self, entries, user_id, upsert=False):
+        """Add conditional data for many footballers in one transaction.
+
+        Raises PermissionError if user_id cannot access one of the footballers.
+        """
+        return metric_ingest.ingest(self.session, self.authorization, Conditional, self.METRIC_FIELDS, entries, user_id, upsert=upsert)
+
+    def export_conditional_data(self, user_id, file_format, team_id=None, league_id=None,
+                     footballer_id=None, start_date=None, end_date=None):
+        """Stream conditional data as CSV/NDJSON chunks (see metric_export.export)."""
+        return metric_export.export(
+            self.session, self.authorization, Conditional, self.METRIC_FIELDS, user_id, file_format,
+            team_id=team_id, league_id=league_id, footballer_id=footballer_id,
+            start_date=start_date, end_date=end_date
+        )
+
     def update_conditional_data(self, entry_id, data, user_id=None):
         """Update existing conditional data for a footballer."""
         try:
@@ -313,34 +337,18 @@ class ConditionalService:
     def get_conditional_history(self, footballer_id, limit=10):
         """Get conditional data history for a footballer."""
         try:
-            entries = self.session.query(Conditional).filter(
-                Conditional.footballer_id == footballer_id
-            ).order_by(Conditional.created_at.desc()).limit(limit).all()
-            
-            result = []
-            for entry in entries:
-                try:
-                    result.append({
-                        'id': entry.id,
-                        'footballer_id': entry.footballer_id,
-                        'vo2_max': entry.vo2_max,
-                        'lactate_levels': entry.lactate_levels,
-                        'training_intensity': entry.training_intensity,
-                        'recovery_times': entry.recovery_times,
-                        'current_vo2_max': entry.current_vo2_max,
-                        'current_lactate_levels': entry.current_lactate_levels,
-                        'current_muscle_strength': entry.current_muscle_strength,
-                        'target_vo2_max': entry.target_vo2_max,
-                        'target_lactate_level': entry.target_lactate_level,
-                        'target_muscle_strength': entry.target_muscle_strength,
-                        'created_at': entry.created_at.strftime('%Y-%m-%d') if entry.created_at else datetime.now().strftime('%Y-%m-%d')
-                    })
-                except Exception as e:
-                    print(f"Error formatting history entry: {str(e)}")
-                    continue
-            
-            return result
+            query = self._history_query(footballer_id).order_by(Conditional.created_at.desc()).limit(limit)
+            return self._serialize_history(query, self.session.execute(query))
             
         except Exception as e:
             print(f"Error in get_conditional_history: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+    def _history_query(self, footballer_id):
+        return select(*self._entry_columns()).where(Conditional.footballer_id == footballer_id)
+
+    def get_conditional_history_page(self, footballer_id, page_size, cursor=None):
+        """Get one keyset page of get_conditional_history (newest first)."""
+        query = self._history_query(footballer_id)
+        entries, next_cursor = keyset_page(self.session, query, Conditional, page_size, cursor, descending=True)
+        return {'items': self._serialize_history(query, entries), 'next_cursor': next_cursor}
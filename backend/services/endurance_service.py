@@ -1,16 +1,27 @@
 # backend/services/endurance_service.py
 from datetime import datetime
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
 from models.league import League
 from models.football_team import FootballTeam
 from models.footballer import Footballer
 from models.endurance import Endurance
-from models.user import User
+from services.authorization_service import AuthorizationService
+from utils.database import upsert_rows
+from utils.pagination import keyset_page
+from utils.serialization import serialize_rows, date_string
+from services import metric_ingest, metric_export, gps_import, graph_series
 from sqlalchemy.orm import Session
 
 class EnduranceService:
+    # Columns written by add/bulk add; also updated on upsert conflicts
+    METRIC_FIELDS = (
+        'running_distance', 'average_speed', 'heart_rate', 'peak_heart_rate',
+        'training_intensity', 'session'
+    )
+
     def __init__(self, session: Session):
         self.session = session
+        self.authorization = AuthorizationService(session)
 
     def get_all_leagues(self):
         """Get all leagues available in the database."""
@@ -20,7 +31,7 @@ class EnduranceService:
     def get_teams_by_league(self, league_id, user_id=None):
         """Get all teams in a specific league that user can access."""
         if user_id:
-            user = self.session.query(User).filter(User.id == user_id).first()
+            user = self.authorization.get_user_access(user_id)
             if user and not user.is_admin and user.team_id:
                 # Non-admin users can only see their assigned team
                 teams = self.session.query(FootballTeam).filter(
@@ -40,8 +51,8 @@ class EnduranceService:
         print(f"DEBUG: get_footballers_by_team called with team_id={team_id}, user_id={user_id}")
         
         if user_id:
-            user = self.session.query(User).filter(User.id == user_id).first()
-            print(f"DEBUG: Found user: {user.id if user else None}, team_id: {user.team_id if user else None}, is_admin: {user.is_admin if user else None}")
+            user = self.authorization.get_user_access(user_id)
+            print(f"DEBUG: Found user: {user_id if user else None}, team_id: {user.team_id if user else None}, is_admin: {user.is_admin if user else None}")
             
             if user and not user.is_admin:
                 try:
@@ -78,7 +89,7 @@ class EnduranceService:
 
     def can_access_entry(self, user_id, entry_id):
         """Check if user can access a specific endurance data entry."""
-        user = self.session.query(User).filter(User.id == user_id).first()
+        user = self.authorization.get_user_access(user_id)
         if not user:
             return False
         
@@ -91,43 +102,78 @@ class EnduranceService:
         if not entry:
             return False
         
-        # Get footballer's team
-        footballer = self.session.query(Footballer).filter(Footballer.footballer_id == entry.footballer_id).first()
-        if not footballer:
-            return False
-        
         # Check if user's team matches footballer's team
-        return user.team_id == footballer.team_id
+        footballer_team_id = self.authorization.get_footballer_team_id(entry.footballer_id)
+        if footballer_team_id is None:
+            return False
+        return user.team_id == footballer_team_id
 
-    def get_endurance_data(self, footballer_id, graph_type=None, start_date=None, end_date=None):
-        """Get endurance data for a footballer within a date range."""
-        query = self.session.query(Endurance).filter(Endurance.footballer_id == footballer_id)
-        
+    def _data_columns(self, graph_type=None, fields=None):
+        """Columns to load: the requested fields, else the ones graph_type draws, else all."""
+        if fields:
+            unknown = [field for field in fields if field not in self.METRIC_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            # Tekrarlanan alanlar bir kez, METRIC_FIELDS sırasıyla yüklenir
+            names = [field for field in self.METRIC_FIELDS if field in fields]
+        else:
+            names = graph_series.graph_fields('endurance', graph_type) or self.METRIC_FIELDS
+        return self._entry_columns(names)
+
+    def _data_query(self, footballer_id, start_date=None, end_date=None, graph_type=None, fields=None):
+        # Read-only: plain row tuples, no ORM entities
+        query = select(*self._data_columns(graph_type, fields)).where(Endurance.footballer_id == footballer_id)
         if start_date and end_date:
-            query = query.filter(Endurance.created_at.between(start_date, end_date))
+            query = query.where(Endurance.created_at.between(start_date, end_date))
+        return query
+
+    def get_endurance_data(self, footballer_id, graph_type=None, start_date=None, end_date=None, fields=None):
+        """Get endurance data for a footballer within a date range.
+
+        Only the columns graph_type draws (or the given fields) are loaded.
+        """
+        query = self._data_query(footballer_id, start_date, end_date, graph_type, fields)
         
         # Order by date
         query = query.order_by(Endurance.created_at)
         
-        results = query.all()
-        
         # Convert to list of dictionaries
-        formatted_results = []
-        for result in results:
-            formatted_result = {
-                'id': result.id,
-                'footballer_id': result.footballer_id,
-                'running_distance': result.running_distance,
-                'average_speed': result.average_speed,
-                'heart_rate': result.heart_rate,
-                'peak_heart_rate': result.peak_heart_rate,
-                'training_intensity': result.training_intensity,
-                'session': result.session,
-                'created_at': result.created_at.strftime('%Y-%m-%d')
-            }
-            formatted_results.append(formatted_result)
+        return self._serialize(query, self.session.execute(query))
+
+    def get_other_players_data(self, footballer_id, start_date=None, end_date=None):
+        """Get endurance data of the footballer's teammates within a date range."""
+        team_id = self.authorization.get_footballer_team_id(footballer_id)
+        if team_id is None:
+            return []
         
-        return formatted_results
+        query = self.session.query(
+            Endurance.running_distance, Endurance.average_speed, Endurance.heart_rate
+        ).join(Footballer, Footballer.footballer_id == Endurance.footballer_id).filter(
+            Footballer.team_id == team_id,
+            Endurance.footballer_id != footballer_id
+        )
+        
+        if start_date and end_date:
+            query = query.filter(Endurance.created_at.between(start_date, end_date))
+        
+        return [{
+            'running_distance': row.running_distance,
+            'average_speed': row.average_speed,
+            'heart_rate': row.heart_rate
+        } for row in query.all()]
+
+    def _serialize(self, query, rows):
+        return serialize_rows(rows, query.selected_columns.keys(), created_at=date_string)
+
+    def _entry_columns(self, fields=None):
+        names = ('id', 'footballer_id') + tuple(fields or self.METRIC_FIELDS) + ('created_at',)
+        return [getattr(Endurance, name) for name in names]
+
+    def get_endurance_data_page(self, footballer_id, page_size, cursor=None, start_date=None, end_date=None, fields=None):
+        """Get one keyset page of get_endurance_data (oldest first)."""
+        query = self._data_query(footballer_id, start_date, end_date, fields=fields)
+        rows, next_cursor = keyset_page(self.session, query, Endurance, page_size, cursor)
+        return {'items': self._serialize(query, rows), 'next_cursor': next_cursor}
 
     def get_endurance_entry_by_date(self, footballer_id, date):
         """Get endurance data for a footballer on a specific date."""
@@ -135,60 +181,88 @@ class EnduranceService:
         start_date = datetime.strptime(date, '%Y-%m-%d')
         end_date = datetime.strptime(date + ' 23:59:59', '%Y-%m-%d %H:%M:%S')
         
-        endurance_entry = self.session.query(Endurance).filter(
+        query = select(*self._entry_columns()).where(
             Endurance.footballer_id == footballer_id,
             Endurance.created_at.between(start_date, end_date)
-        ).first()
+        ).limit(1)
+        rows = self.session.execute(query).all()
         
-        if endurance_entry:
-            return {
-                'id': endurance_entry.id,
-                'footballer_id': endurance_entry.footballer_id,
-                'running_distance': endurance_entry.running_distance,
-                'average_speed': endurance_entry.average_speed,
-                'heart_rate': endurance_entry.heart_rate,
-                'peak_heart_rate': endurance_entry.peak_heart_rate,
-                'training_intensity': endurance_entry.training_intensity,
-                'session': endurance_entry.session,
-                'created_at': endurance_entry.created_at.strftime('%Y-%m-%d')
-            }
+        if rows:
+            return self._serialize(query, rows)[0]
         
         return None
 
-    def add_endurance_data(self, footballer_id, data):
-        """Add new endurance data for a footballer."""
+    def add_endurance_data(self, footballer_id, data, upsert=False):
+        """Add today's endurance data for a footballer.
+
+        A single INSERT ... ON CONFLICT on (footballer_id, entry_date): an
+        existing entry for today is rejected, or overwritten with upsert=True.
+        """
         try:
-            # Check if entry already exists for today
-            today = datetime.now().strftime('%Y-%m-%d')
-            existing_entry = self.get_endurance_entry_by_date(footballer_id, today)
-            
-            if existing_entry:
-                return None, "Endurance data already exists for today. Please use update instead."
-            
-            # Create new endurance entry
-            new_entry = Endurance(
-                footballer_id=footballer_id,
-                running_distance=data.get('running_distance'),
-                average_speed=data.get('average_speed'),
-                heart_rate=data.get('heart_rate'),
-                peak_heart_rate=data.get('peak_heart_rate'),
-                training_intensity=data.get('training_intensity'),
-                session=data.get('session')
+            created_at = datetime.utcnow()
+
+            values = {field: data.get(field) for field in self.METRIC_FIELDS}
+            values.update(
+                footballer_id=int(footballer_id),
+                created_at=created_at,
+                entry_date=created_at.date(),
+                timestamp=created_at
             )
-            
-            self.session.add(new_entry)
+            ids = upsert_rows(
+                self.session, Endurance, [values], ['footballer_id', 'entry_date'],
+                update_columns=self.METRIC_FIELDS + ('timestamp',) if upsert else None
+            )
+
+            if not ids:
+                return None, "Endurance data already exists for today. Please use update instead."
+
             self.session.commit()
-            
+
             return {
-                'id': new_entry.id,
-                'footballer_id': new_entry.footballer_id,
-                'created_at': new_entry.created_at.strftime('%Y-%m-%d')
+                'id': ids[0],
+                'footballer_id': values['footballer_id'],
+                'created_at': created_at.strftime('%Y-%m-%d')
             }, "Endurance data added successfully"
-            
+
         except Exception as e:
             self.session.rollback()
             return None, str(e)    
         
+    def add_endurance_data_bulk(self, entries, user_id, upsert=False):
+        """Add endurance data for many footballers in one transaction.
+
+        Raises PermissionError if user_id cannot access one of the footballers.
+        """
+        return metric_ingest.ingest(self.session, self.authorization, Endurance, self.METRIC_FIELDS, entries, user_id, upsert=upsert)
+
+    def import_gps_file(self, file, file_format, user_id, upsert=False):
+        """Import a GPS/wearable export (csv or parquet) as endurance entries.
+
+        Samples are aggregated per footballer per day and written in one
+        transaction. Raises PermissionError like add_endurance_data_bulk.
+        """
+        try:
+            entries = gps_import.aggregate_file(file, file_format)
+        except ValueError as e:
+            return None, str(e)
+
+        if not entries:
+            return None, "No valid samples found in file"
+
+        return metric_ingest.ingest(
+            self.session, self.authorization, Endurance, self.METRIC_FIELDS, entries, user_id,
+            upsert=upsert, max_entries=None
+        )
+
+    def export_endurance_data(self, user_id, file_format, team_id=None, league_id=None,
+                     footballer_id=None, start_date=None, end_date=None):
+        """Stream endurance data as CSV/NDJSON chunks (see metric_export.export)."""
+        return metric_export.export(
+            self.session, self.authorization, Endurance, self.METRIC_FIELDS, user_id, file_format,
+            team_id=team_id, league_id=league_id, footballer_id=footballer_id,
+            start_date=start_date, end_date=end_date
+        )
+
     def update_endurance_data(self, entry_id, data, user_id=None):
         """Update existing endurance data for a footballer."""
         try:
@@ -251,20 +325,16 @@ class EnduranceService:
             self.session.rollback()
             return False, str(e)
 
+    def _history_query(self, footballer_id):
+        return select(*self._entry_columns()).where(Endurance.footballer_id == footballer_id)
+
     def get_endurance_history(self, footballer_id, limit=10):
         """Get endurance data history for a footballer."""
-        entries = self.session.query(Endurance).filter(
-            Endurance.footballer_id == footballer_id
-        ).order_by(Endurance.created_at.desc()).limit(limit).all()
-        
-        return [{
-            'id': entry.id,
-            'footballer_id': entry.footballer_id,
-            'running_distance': entry.running_distance,
-            'average_speed': entry.average_speed,
-            'heart_rate': entry.heart_rate,
-            'peak_heart_rate': entry.peak_heart_rate,
-            'training_intensity': entry.training_intensity,
-            'session': entry.session,
-            'created_at': entry.created_at.strftime('%Y-%m-%d')
-        } for entry in entries]
\ No newline at end of file
+        query = self._history_query(footballer_id).order_by(Endurance.created_at.desc()).limit(limit)
+        return self._serialize(query, self.session.execute(query))
+
+    def get_endurance_history_page(self, footballer_id, page_size, cursor=None):
+        """Get one keyset page of get_endurance_history (newest first)."""
+        query = self._history_query(footballer_id)
+        rows, next_cursor = keyset_page(self.session, query, Endurance, page_size, cursor, descending=True)
+        return {'items': self._serialize(query, rows), 'next_cursor': next_cursor}
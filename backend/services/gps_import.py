@@ -0,0 +1,142 @@
+# backend/services/gps_import.py
+"""Streaming aggregation of GPS vest / wearable exports into Endurance entries.
+
+Exports hold one row per sample. Files are read in chunks and every chunk
+is reduced to running totals per (footballer, day) with pandas group-bys,
+so memory depends on the number of players and days, not on file size.
+
+Expected columns (case-insensitive, extra columns are ignored):
+    footballer_id, timestamp        required
+    distance                        metres covered since the previous sample
+    speed                           km/h
+    heart_rate                      bpm
+    session                         session number
+"""
+import os
+
+import numpy as np
+
+# pandas is imported inside the functions below, so API processes that never
+# receive a GPS export do not pay for loading it
+
+CHUNK_ROWS = int(os.getenv('GPS_IMPORT_CHUNK_ROWS', 50000))
+
+REQUIRED_COLUMNS = ('footballer_id', 'timestamp')
+VALUE_COLUMNS = ('distance', 'speed', 'heart_rate', 'session')
+
+# How partial totals of two chunks are combined
+_TOTALS = {
+    'distance_sum': 'sum', 'distance_count': 'sum',
+    'speed_sum': 'sum', 'speed_count': 'sum',
+    'heart_rate_sum': 'sum', 'heart_rate_count': 'sum',
+    'heart_rate_max': 'max', 'session': 'max',
+}
+
+def detect_format(file_name):
+    """Guess csv/parquet from a file name."""
+    extension = os.path.splitext(file_name or '')[1].lower()
+    return {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}.get(extension)
+
+def aggregate_file(file, file_format, chunk_rows=CHUNK_ROWS):
+    """Aggregate a whole export into endurance entries, one per footballer per day.
+
+    Raises ValueError for unsupported formats or missing columns.
+    """
+    import pandas as pd
+
+    totals = None
+    for chunk in _read_chunks(file, file_format, chunk_rows):
+        partial = _aggregate_chunk(chunk)
+        if partial.empty:
+            continue
+        if totals is None:
+            totals = partial
+        else:
+            totals = pd.concat([totals, partial]).groupby(level=['footballer_id', 'day']).agg(_TOTALS)
+
+    if totals is None:
+        return []
+    return _to_entries(totals)
+
+def _normalize(column):
+    return str(column).strip().lower()
+
+def _read_chunks(file, file_format, chunk_rows):
+    wanted = set(REQUIRED_COLUMNS + VALUE_COLUMNS)
+
+    if file_format == 'csv':
+        import pandas as pd
+        # Only the needed columns are parsed
+        for chunk in pd.read_csv(file, chunksize=chunk_rows, usecols=lambda column: _normalize(column) in wanted):
+            yield chunk.rename(columns=_normalize)
+
+    elif file_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError('Parquet import requires the pyarrow package')
+
+        parquet_file = pq.ParquetFile(file)
+        columns = [name for name in parquet_file.schema_arrow.names if _normalize(name) in wanted]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas().rename(columns=_normalize)
+
+    else:
+        raise ValueError(f'Unsupported file format: {file_format}. Use csv or parquet')
+
+def _aggregate_chunk(chunk):
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+    import pandas as pd
+    samples = pd.DataFrame({
+        'footballer_id': pd.to_numeric(chunk['footballer_id'], errors='coerce'),
+        'day': pd.to_datetime(chunk['timestamp'], errors='coerce').dt.normalize(),
+    })
+    for column in VALUE_COLUMNS:
+        samples[column] = pd.to_numeric(chunk[column], errors='coerce') if column in chunk.columns else np.nan
+
+    # Okunamayan oyuncu/zaman bilgisi olan örnekler atlanır
+    samples = samples.dropna(subset=['footballer_id', 'day'])
+    samples['footballer_id'] = samples['footballer_id'].astype('int64')
+
+    grouped = samples.groupby(['footballer_id', 'day'])
+    return pd.DataFrame({
+        'distance_sum': grouped['distance'].sum(),
+        'distance_count': grouped['distance'].count(),
+        'speed_sum': grouped['speed'].sum(),
+        'speed_count': grouped['speed'].count(),
+        'heart_rate_sum': grouped['heart_rate'].sum(),
+        'heart_rate_count': grouped['heart_rate'].count(),
+        'heart_rate_max': grouped['heart_rate'].max(),
+        'session': grouped['session'].max(),
+    })
+
+def _to_entries(totals):
+    # Averages are derived from the running sums once all chunks are combined
+    with np.errstate(divide='ignore', invalid='ignore'):
+        running_distance = (totals['distance_sum'] / 1000).where(totals['distance_count'] > 0)
+        average_speed = totals['speed_sum'] / totals['speed_count']
+        heart_rate = (totals['heart_rate_sum'] / totals['heart_rate_count']).round()
+
+    entries = []
+    for (footballer_id, day), distance, speed, rate, peak, session in zip(
+        totals.index, running_distance, average_speed, heart_rate, totals['heart_rate_max'], totals['session']
+    ):
+        entries.append({
+            'footballer_id': int(footballer_id),
+            'created_at': day.strftime('%Y-%m-%d'),
+            'running_distance': _value(distance, 3),
+            'average_speed': _value(speed, 2),
+            'heart_rate': _int_value(rate),
+            'peak_heart_rate': _int_value(peak),
+            'session': _int_value(session),
+        })
+    return entries
+
+def _value(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+def _int_value(value):
+    return None if np.isnan(value) else int(value)
@@ -0,0 +1,75 @@
+# backend/services/graph_cache.py
+"""Content-addressed cache for rendered graphs.
+
+A graph's file name ends with a fingerprint of everything that affects the
+image (domain, graph type, footballer, date range, source rows and renderer
+version), so an unchanged request can be served from disk without rendering.
+"""
+import glob
+import hashlib
+import json
+import os
+
+from services.graph_catalog import RENDERER_VERSION
+
+MAX_CACHE_BYTES = int(os.getenv('GRAPH_CACHE_MAX_MB', 256)) * 1024 * 1024
+
+def fingerprint(domain, graph_type, footballer_id, start_date, end_date, rows, other_players_data=None):
+    """Hash the inputs of a render."""
+    payload = json.dumps(
+        [RENDERER_VERSION, domain, graph_type, str(footballer_id), start_date, end_date, rows, other_players_data],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def _file_prefix(footballer_id, graph_type, start_date, end_date):
+    return f"{footballer_id}_{graph_type.replace(' ', '_')}_{start_date}_{end_date}_"
+
+def graph_file_name(domain, graph_type, footballer_id, start_date, end_date, rows, other_players_data=None):
+    """Build the cache file name for a render."""
+    digest = fingerprint(domain, graph_type, footballer_id, start_date, end_date, rows, other_players_data)
+    return f"{_file_prefix(footballer_id, graph_type, start_date, end_date)}{digest}.png"
+
+def lookup(file_path):
+    """Return True if the graph is already rendered, marking it recently used."""
+    try:
+        os.utime(file_path)
+        return True
+    except FileNotFoundError:
+        return False
+
+def after_render(file_path):
+    """Drop outdated renders of the same graph and keep the cache within its size limit."""
+    directory, file_name = os.path.split(file_path)
+    prefix = file_name[:file_name.rindex('_') + 1]
+    for stale_path in glob.glob(os.path.join(glob.escape(directory), glob.escape(prefix) + '*.png')):
+        if stale_path != file_path:
+            _remove(stale_path)
+    enforce_size_limit(os.path.dirname(directory))
+
+def enforce_size_limit(graphs_root, max_bytes=MAX_CACHE_BYTES):
+    """Evict least recently used graphs until graphs_root fits in max_bytes."""
+    entries = []
+    total = 0
+    for path in glob.glob(os.path.join(glob.escape(graphs_root), '*', '*.png')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        _remove(path)
+        total -= size
+        if total <= max_bytes:
+            break
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
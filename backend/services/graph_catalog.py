@@ -0,0 +1,63 @@
+# backend/services/graph_catalog.py
+"""Graph types and render options known to the API.
+
+Kept apart from graph_renderer so request handlers can validate graph
+requests and build cache keys without importing matplotlib and seaborn;
+those are only loaded by the render workers of graph_jobs.
+"""
+import os
+
+# Bump whenever the output of a chart in graph_renderer changes so cached renders are refreshed
+RENDERER_VERSION = 3
+
+GRAPH_TYPES = {
+    'physical': (
+        "Physical Progress Tracker",
+        "Training Progress Time Tracker",
+        "Body Composition Progress Tracker",
+        "Athletic Performance Radar Analysis",
+        "BMI Distribution Analysis",
+        "Comprehensive Physical Metrics Box Plot",
+        "Dynamic Body Metrics Tracker",
+    ),
+    'conditional': (
+        "VO2 Max Progression Over 30 Days",
+        "Daily Lactate Levels Monitoring",
+        "Training Intensity Progression",
+        "Recovery Distribution",
+        "VO2 Max Trend with Regression",
+        "Conditional Goal Progress Overview",
+    ),
+    'endurance': (
+        "Key Endurance Metrics Overview",
+        "Endurance Trends",
+        "Peak Heart Rate Focused Endurance Development",
+        "Performance Radar",
+    ),
+}
+
+# format -> mimetype of in-memory renders (webp needs Pillow with WebP support)
+IMAGE_FORMATS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+}
+MAX_DPI = int(os.getenv('GRAPH_MAX_DPI', 300))
+
+def is_supported(domain, graph_type):
+    """Check if graph_type can be rendered for the given domain."""
+    return graph_type in GRAPH_TYPES.get(domain, ())
+
+def image_options(image_format=None, dpi=None):
+    """Validate an in-memory render's format and DPI; raises ValueError."""
+    image_format = (image_format or 'png').lower()
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}. Use {', '.join(IMAGE_FORMATS)}")
+    if dpi is not None:
+        try:
+            dpi = int(dpi)
+        except (TypeError, ValueError):
+            raise ValueError('dpi must be a number')
+        if not 10 <= dpi <= MAX_DPI:
+            raise ValueError(f'dpi must be between 10 and {MAX_DPI}')
+    return image_format, dpi
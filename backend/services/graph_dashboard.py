@@ -0,0 +1,103 @@
+# backend/services/graph_dashboard.py
+"""Several graphs of one footballer in one request (/generate-dashboard).
+
+The metric rows are loaded once, with the union of the columns the requested
+graphs read, and then cut down per graph to exactly the rows /generate-graph
+would have loaded, so both endpoints share the graph cache. Graphs missing
+from the cache are rendered in parallel in the render pool.
+"""
+import base64
+import os
+
+from services import graph_cache, graph_catalog, graph_jobs, graph_series
+
+def graph_types_arg(domain, graph_types):
+    """Validate the requested graph types (all of the domain's if omitted); raises ValueError."""
+    if not graph_types:
+        return list(graph_catalog.GRAPH_TYPES[domain])
+    if not isinstance(graph_types, list):
+        raise ValueError('graph_types must be a list')
+
+    unknown = [str(graph_type) for graph_type in graph_types if not graph_catalog.is_supported(domain, graph_type)]
+    if unknown:
+        raise ValueError(f"Unknown graph type(s): {', '.join(unknown)}")
+    # Aynı grafik iki kez istenirse bir kez çizilir
+    return list(dict.fromkeys(graph_types))
+
+def output_options(data):
+    """Return (output, image_format, dpi) from a request body; raises ValueError.
+
+    output is 'data' ("format": "data"), 'base64' or 'file' (default).
+    """
+    if data.get('format') == 'data':
+        return 'data', None, None
+
+    output = data.get('output', 'file')
+    if output == 'file':
+        return output, None, None
+    if output == 'base64':
+        return (output,) + graph_catalog.image_options(data.get('format'), data.get('dpi'))
+    raise ValueError(f'Unknown output: {output}. Use file or base64')
+
+def dashboard_fields(domain, graph_types):
+    """Union of the columns the graph types read."""
+    fields = []
+    for graph_type in graph_types:
+        for field in graph_series.graph_fields(domain, graph_type):
+            if field not in fields:
+                fields.append(field)
+    return fields
+
+def chart_rows(domain, graph_type, rows):
+    """The rows as /generate-graph loads them for graph_type (only its columns)."""
+    keys = ('id', 'footballer_id') + graph_series.graph_fields(domain, graph_type) + ('created_at',)
+    return [{key: row[key] for key in keys} for row in rows]
+
+def build(domain, graph_types, rows, footballer_id, start_date, end_date, static_dir, static_url,
+          output='file', image_format='png', dpi=None, other_players_data=None):
+    """Produce every requested graph and return one result dict per graph type.
+
+    other_players_data maps a graph type to the teammates' rows it compares
+    against. A graph that fails carries an 'error' instead of failing the rest.
+    """
+    other_players_data = other_players_data or {}
+    results = {}
+    charts = []
+
+    for graph_type in graph_types:
+        graph_rows = chart_rows(domain, graph_type, rows)
+        other = other_players_data.get(graph_type)
+
+        if output == 'data':
+            try:
+                results[graph_type] = {'series': graph_series.build_series(domain, graph_type, graph_rows, other)}
+            except Exception as e:
+                results[graph_type] = {'error': str(e)}
+            continue
+
+        file_path = None
+        if output == 'file':
+            file_name = graph_cache.graph_file_name(domain, graph_type, footballer_id, start_date, end_date, graph_rows, other)
+            file_path = os.path.join(static_dir, file_name)
+            results[graph_type] = {'path': f'{static_url}/{file_name}'}
+
+            # Aynı verilerle daha önce çizildiyse tekrar çizme
+            if graph_cache.lookup(file_path):
+                results[graph_type]['cached'] = True
+                continue
+
+        charts.append((graph_type, graph_rows, file_path, other))
+
+    if charts:
+        rendered = graph_jobs.render_many(domain, charts, image_format, dpi)
+        for (graph_type, _, _, _), (result, error) in zip(charts, rendered):
+            if error:
+                results[graph_type] = {'error': error}
+            elif output == 'base64':
+                results[graph_type] = {
+                    'format': image_format,
+                    'mimetype': graph_catalog.IMAGE_FORMATS[image_format],
+                    'image': base64.b64encode(result).decode('ascii')
+                }
+
+    return [dict(graph_type=graph_type, **results[graph_type]) for graph_type in graph_types]
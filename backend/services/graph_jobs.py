@@ -0,0 +1,175 @@
+# backend/services/graph_jobs.py
+"""In-process render queue for /generate-graph.
+
+Charts are rendered in a pool of worker processes (rendering is CPU bound and
+holds the GIL), so request threads only enqueue work. No external broker is needed; job state
+lives in the memory of the API process that accepted the job.
+
+A job id is the name of the file it renders. Any API worker can report a job
+as done once that file exists. A running or failed job is only known to the
+worker that accepted it, and other workers answer "not found". With several
+gunicorn workers, clients should keep polling on 404 until they time out.
+
+graph_renderer (matplotlib, seaborn) is imported inside the
+worker functions, so it is only ever loaded by the worker processes.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+import threading
+import time
+
+from services import graph_cache
+
+RENDER_WORKERS = int(os.getenv('GRAPH_RENDER_WORKERS', 2))
+JOB_RETENTION_SECONDS = int(os.getenv('GRAPH_JOB_RETENTION', 600))
+
+_executor = None
+_executor_lock = threading.Lock()
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def get_executor():
+    """Return the shared render pool, starting it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: never fork a process that holds DB connections and threads
+                _executor = ProcessPoolExecutor(
+                    max_workers=RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _executor
+
+def _submit(fn, *args):
+    """Submit to the render pool, starting a new pool once if a dead worker broke it.
+
+    If the new pool is broken as well, BrokenProcessPool is raised to the caller.
+    """
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        # Bir worker öldüyse (OOM, segfault) havuz kalıcı olarak bozulur
+        _discard_executor(executor)
+
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+
+def _discard_executor(executor):
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _render_and_store(domain, graph_type, rows, file_path, other_players_data=None):
+    # Runs in a worker process
+    from services.graph_renderer import render_graph
+    render_graph(domain, graph_type, rows, file_path, other_players_data)
+    graph_cache.after_render(file_path)
+    return file_path
+
+def _render_image(domain, graph_type, rows, image_format='png', dpi=None, other_players_data=None):
+    # Runs in a worker process
+    from services.graph_renderer import render_image
+    return render_image(domain, graph_type, rows, image_format, dpi, other_players_data)
+
+def render(domain, graph_type, rows, file_path, other_players_data=None):
+    """Render in the pool and wait for the result."""
+    future = _submit(_render_and_store, domain, graph_type, rows, file_path, other_players_data)
+    return future.result()
+
+def render_bytes(domain, graph_type, rows, image_format='png', dpi=None, other_players_data=None):
+    """Render in the pool into memory and return the image bytes (nothing is written to disk)."""
+    future = _submit(_render_image, domain, graph_type, rows, image_format, dpi, other_players_data)
+    return future.result()
+
+def render_many(domain, charts, image_format='png', dpi=None):
+    """Render several charts of one domain in parallel in the pool.
+
+    charts is a list of (graph_type, rows, file_path, other_players_data);
+    a chart with file_path None is rendered into memory. Returns one
+    (file path or image bytes, error message) pair per chart, in order.
+    """
+    futures = []
+    for graph_type, rows, file_path, other_players_data in charts:
+        try:
+            if file_path:
+                futures.append(_submit(_render_and_store, domain, graph_type, rows, file_path, other_players_data))
+            else:
+                futures.append(_submit(_render_image, domain, graph_type, rows, image_format, dpi, other_players_data))
+        except BrokenProcessPool as e:
+            futures.append(e)
+
+    results = []
+    for future in futures:
+        if isinstance(future, BrokenProcessPool):
+            results.append((None, str(future)))
+            continue
+        try:
+            results.append((future.result(), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+def submit(user_id, domain, graph_type, rows, file_path, relative_path, other_players_data=None):
+    """Queue a render and return its job id (the output file name) immediately.
+
+    A render of the same file that is still queued here is shared, not repeated.
+    """
+    _prune_jobs()
+    job_id = os.path.basename(file_path)
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job and job['domain'] == domain and not job['future'].done():
+            job['user_ids'].add(user_id)
+            return job_id
+        _jobs[job_id] = {
+            'future': _submit(_render_and_store, domain, graph_type, rows, file_path, other_players_data),
+            'user_ids': {user_id},
+            'domain': domain,
+            'path': relative_path,
+            'created': time.time()
+        }
+    return job_id
+
+def get_job(job_id, user_id, domain=None, output_dir=None, output_url=None):
+    """Get the status of a job submitted by user_id, or None if unknown.
+
+    output_dir/output_url are where the domain's graphs are saved and served.
+    A job this process does not know counts as done once its file exists there.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if not job or user_id not in job['user_ids'] or (domain and job['domain'] != domain):
+        # Başka bir worker'a gönderilmiş olabilir: dosya varsa bitmiştir
+        if output_dir and os.path.basename(job_id) == job_id and os.path.isfile(os.path.join(output_dir, job_id)):
+            return {'job_id': job_id, 'status': 'done', 'path': f'{output_url}/{job_id}'}
+        return None
+
+    future = job['future']
+    status = {'job_id': job_id}
+    if future.done():
+        error = future.exception()
+        if error:
+            status.update({'status': 'failed', 'error': str(error)})
+        else:
+            status.update({'status': 'done', 'path': job['path']})
+    else:
+        status['status'] = 'running' if future.running() else 'queued'
+    return status
+
+def _prune_jobs():
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    with _jobs_lock:
+        expired = [job_id for job_id, job in _jobs.items()
+                   if job['created'] < cutoff and job['future'].done()]
+        for job_id in expired:
+            del _jobs[job_id]
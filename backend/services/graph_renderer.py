@@ -0,0 +1,546 @@
+# backend/services/graph_renderer.py
+"""Chart rendering for the development dashboards.
+
+These functions only depend on the rows handed to them (no database or Flask
+state), so they can run inside the render worker processes of graph_jobs.
+
+Every graph type is a Chart subclass drawing on its own matplotlib Figure
+with an Agg canvas; pyplot and its global figure list / rcParams are never
+used, so renders do not leak figures or styles into each other and can run
+concurrently in threads.
+
+Importing this module loads matplotlib and seaborn, so only the
+render workers of graph_jobs do; the API itself uses graph_catalog.
+"""
+import io
+
+import numpy as np
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from datetime import datetime
+from services.graph_catalog import GRAPH_TYPES
+from services.graph_series import physical_targets, target_percentage, convert_height_to_float
+from services.trends import least_squares, trend_values
+
+# (domain, graph_type) -> Chart subclass
+_CHARTS = {}
+
+def render_figure(domain, graph_type, rows, other_players_data=None):
+    """Build the Figure for domain/graph_type from rows."""
+    if domain not in GRAPH_TYPES:
+        raise ValueError(f'Unknown graph domain: {domain}')
+    chart = _CHARTS.get((domain, graph_type))
+    if chart is None:
+        raise ValueError(f'Unknown graph type: {graph_type}')
+    return chart(rows, other_players_data).figure()
+
+def render_graph(domain, graph_type, rows, file_path, other_players_data=None):
+    """Render a chart for domain/graph_type from rows and save it to file_path."""
+    render_figure(domain, graph_type, rows, other_players_data).savefig(file_path)
+    return file_path
+
+def render_image(domain, graph_type, rows, image_format='png', dpi=None, other_players_data=None):
+    """Render a chart into memory and return the encoded image bytes."""
+    buffer = io.BytesIO()
+    # dpi=None: figure's default, same as the saved files
+    render_figure(domain, graph_type, rows, other_players_data).savefig(buffer, format=image_format, dpi=dpi or 'figure')
+    return buffer.getvalue()
+
+
+class ChartStyle:
+    """Axes look applied to one chart's axes, instead of plt.style.use on global rcParams."""
+
+    def __init__(self, facecolor=None, edgecolor=None, linewidth=None, text_color=None, axisbelow=None,
+                 patch_linewidth=None):
+        self.facecolor = facecolor
+        self.edgecolor = edgecolor
+        self.linewidth = linewidth
+        self.text_color = text_color
+        self.axisbelow = axisbelow
+        # Edge width for bars and the legend frame
+        self.patch_linewidth = patch_linewidth
+
+    def apply(self, ax):
+        if self.facecolor:
+            ax.set_facecolor(self.facecolor)
+        for spine in ax.spines.values():
+            if self.edgecolor:
+                spine.set_edgecolor(self.edgecolor)
+            if self.linewidth is not None:
+                spine.set_linewidth(self.linewidth)
+        if self.text_color:
+            ax.tick_params(colors=self.text_color)
+            ax.xaxis.label.set_color(self.text_color)
+            ax.yaxis.label.set_color(self.text_color)
+        if self.axisbelow is not None:
+            ax.set_axisbelow(self.axisbelow)
+
+    def legend(self, ax, **kwargs):
+        """ax.legend() with the box in the axes colour, as legend.facecolor='inherit' does."""
+        legend = ax.legend(facecolor=ax.get_facecolor(), **kwargs)
+        if self.patch_linewidth is not None:
+            legend.get_frame().set_linewidth(self.patch_linewidth)
+        return legend
+
+# matplotlib's 'ggplot' style, as far as the charts below don't override it
+GGPLOT = ChartStyle(facecolor='#E5E5E5', edgecolor='white', linewidth=1.0, text_color='#555555', axisbelow=True,
+                    patch_linewidth=0.5)
+
+
+class Chart:
+    """One graph type. Subclasses set the figure layout and implement draw()."""
+
+    figsize = (10, 5)
+    layout = (1, 1)
+    polar = False
+    style = None
+
+    def __init__(self, rows, other_players_data=None):
+        self.rows = rows
+        self.other_players_data = other_players_data or []
+
+    def values(self, field):
+        return [row[field] for row in self.rows]
+
+    @property
+    def days(self):
+        # Convert string dates to datetime objects for plotting
+        return [datetime.strptime(row['created_at'], '%Y-%m-%d') for row in self.rows]
+
+    def figure(self):
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.subplots(*self.layout, subplot_kw=dict(polar=True) if self.polar else None)
+        if self.style:
+            self.style.apply(ax)
+        self.draw(fig, ax)
+        return fig
+
+    def draw(self, fig, ax):
+        raise NotImplementedError
+
+def chart(domain, graph_type):
+    """Register a Chart subclass for domain/graph_type."""
+    def register(cls):
+        _CHARTS[(domain, graph_type)] = cls
+        return cls
+    return register
+
+def _day_ticks(ax, days):
+    ax.set_xticks(days, [day.strftime('%d-%m') for day in days], rotation=45, fontsize=10)
+
+
+# Physical
+
+def _progress_metrics(chart):
+    return {
+        "Muscle Mass (kg)": chart.values('muscle_mass'),
+        "Muscle Strength (kg)": chart.values('muscle_strength'),
+        "Muscle Endurance (reps)": chart.values('muscle_endurance'),
+        "Flexibility (cm)": chart.values('flexibility')
+    }
+
+def _bmi_values(chart):
+    # BMI hesaplama: BMI = Ağırlık / (Boy * Boy)
+    height_values = [convert_height_to_float(height) for height in chart.values('heights')]
+    return [weight / (height ** 2) for weight, height in zip(chart.values('weight'), height_values)]
+
+def _progress_color(value, target):
+    percentage = (value / target) * 100
+
+    if percentage >= 85:  # Green for 85% and above
+        return "#6BBE45"  # Matte Green
+    elif percentage >= 70:  # Light orange for 70% to 85%
+        return "#FFA500"  # Matte Orange
+    else:  # Red for below 70%
+        return "#D32F2F"  # Matte Red
+
+@chart('physical', "Physical Progress Tracker")
+class PhysicalProgressChart(Chart):
+    figsize = (10, 6)
+
+    def draw(self, fig, ax):
+        metrics = _progress_metrics(self)
+        targets = physical_targets(metrics)
+
+        ax.set_facecolor('#f0f0f0')
+        card_width = 180
+        card_height = 100
+        ax.set_xlim(0, card_width * len(metrics))
+        ax.set_ylim(0, card_height)
+
+        for i, (metric, values) in enumerate(metrics.items()):
+            # Boş (None) ölçümler ortalamaya katılmaz
+            present = [value for value in values if value is not None]
+            avg_value = sum(present) / len(present) if present else 0.0
+            target = targets[metric]
+            percentage = (avg_value / target) * 100
+            color = _progress_color(avg_value, target)
+
+            # Metrik kartını çiz
+            ax.add_patch(Rectangle((i * card_width, 0), card_width, card_height, color='white', alpha=0.9))
+            fill_height = (avg_value / target) * card_height
+            ax.add_patch(Rectangle((i * card_width, 0), card_width, fill_height, color=color))
+
+            # Metin etiketleri ekle
+            ax.text((i + 0.5) * card_width, 60, f'Avg: {avg_value:.1f}', ha='center', fontsize=10)
+            ax.text((i + 0.5) * card_width, 40, f'Target: {target}', ha='center', fontsize=10)
+            ax.text((i + 0.5) * card_width, 20, f'{percentage:.1f}%', ha='center', fontsize=10, color=color)
+            ax.text((i + 0.5) * card_width, 5, metric, ha='center', fontsize=9)
+
+        ax.axis('off')
+
+@chart('physical', "Training Progress Time Tracker")
+class TrainingProgressChart(Chart):
+
+    def draw(self, fig, ax):
+        metrics = _progress_metrics(self)
+
+        # Hedef değerler: her metrik için en iyi değerin %10 üzerine yuvarlanır
+        targets = physical_targets(metrics)
+
+        days = self.days
+        for metric, label in (("Muscle Mass (kg)", "Muscle Mass (%)"),
+                              ("Muscle Strength (kg)", "Muscle Strength (%)"),
+                              ("Muscle Endurance (reps)", "Muscle Endurance (%)"),
+                              ("Flexibility (cm)", "Flexibility (%)")):
+            # Yüzdelik hesaplamalar
+            # Eksik ölçümler çizgide boşluk olarak kalır
+            percentages = [target_percentage(value, targets[metric]) for value in metrics[metric]]
+            ax.plot(days, [np.nan if value is None else value for value in percentages], label=label)
+
+        ax.set_title("Training Progress Time Tracker")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Value (%)")
+        ax.legend()
+        ax.grid(True)
+
+        # X eksenindeki tarihleri daha okunabilir hale getirmek için döndürme
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
+
+@chart('physical', "Body Composition Progress Tracker")
+class BodyCompositionChart(Chart):
+
+    def draw(self, fig, ax):
+        days = self.days
+        weight_values = self.values('weight')
+        height_values = [convert_height_to_float(height) for height in self.values('heights')]
+        muscle_mass_values = self.values('muscle_mass')
+
+        # Ağırlık, boy ve kas kütlesi için çizimler
+        ax.fill_between(days, weight_values, color='lightblue', alpha=0.5, label='Weight (kg)')
+        ax.fill_between(days, height_values, color='lightgreen', alpha=0.5, label='Height (cm)')
+        ax.fill_between(days, muscle_mass_values, color='salmon', alpha=0.5, label='Muscle Mass (kg)')
+
+        ax.set_title("Body Composition Progress Tracker", fontsize=16)
+        ax.set_xlabel("Date", fontsize=10)
+        ax.set_ylabel("Value", fontsize=14)
+        _day_ticks(ax, days)
+        ax.set_yticks(np.arange(0, max(weight_values + height_values + muscle_mass_values) + 5, 5))
+
+        ax.legend(loc='upper right')
+        ax.grid(True)
+
+@chart('physical', "Athletic Performance Radar Analysis")
+class AthleticRadarChart(Chart):
+    figsize = (8, 8)
+    polar = True
+
+    def draw(self, fig, ax):
+        metrics = _progress_metrics(self)
+        averages = [sum(values) / len(values) for values in metrics.values()]
+        labels = list(metrics.keys())
+
+        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+        averages += averages[:1]  # Close the radar chart
+        angles += angles[:1]
+
+        ax.fill(angles, averages, color='blue', alpha=0.25)
+        ax.plot(angles, averages, color='blue', linewidth=2)
+        ax.set_yticks([])
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(labels)
+        ax.set_title("Athletic Performance Radar Analysis", y=1.1)
+
+@chart('physical', "BMI Distribution Analysis")
+class BMIDistributionChart(Chart):
+
+    def draw(self, fig, ax):
+        ax.hist(_bmi_values(self), bins=10, color='royalblue', edgecolor='black', alpha=0.9)
+        ax.set_title('BMI Distribution (Histogram)', fontsize=16, fontweight='bold')
+        ax.set_xlabel('BMI', fontsize=14)
+        ax.set_ylabel('Frequency', fontsize=14)
+        ax.grid(axis='y', alpha=0.75)
+        ax.tick_params(labelsize=12)
+
+@chart('physical', "Comprehensive Physical Metrics Box Plot")
+class PhysicalBoxPlotChart(Chart):
+
+    def draw(self, fig, ax):
+        # Kas kütlesi, kas gücü, kas dayanıklılığı, esneklik ve BMI verilerini birleştiriyoruz
+        values = list(_progress_metrics(self).values()) + [_bmi_values(self)]
+        sns.boxplot(data=values, palette="pastel", orient="h", width=0.4, ax=ax)
+
+        ax.set_title('Physical Parameters Distribution (Box Plot)', fontsize=16, fontweight='bold')
+        ax.set_yticks([0, 1, 2, 3, 4], ['Muscle Mass (kg)', 'Muscle Strength (kg)',
+                                        'Muscle Endurance (reps)', 'Flexibility (cm)', 'BMI'],
+                      fontsize=12)
+
+        # Y-label'leri sağa kaydırmak için labelpad parametresi kullanıyoruz
+        ax.set_ylabel('Physical Parameters', fontsize=14, labelpad=20)
+        ax.set_xlabel('Values', fontsize=14)
+
+@chart('physical', "Dynamic Body Metrics Tracker")
+class BodyMetricsChart(Chart):
+    CIRCUMFERENCES = (
+        ('thigh_circumference', "Thigh Circumference"),
+        ('shoulder_circumference', "Shoulder Circumference"),
+        ('arm_circumference', "Arm Circumference"),
+        ('chest_circumference', "Chest Circumference"),
+        ('back_circumference', "Back Circumference"),
+        ('waist_circumference', "Waist Circumference"),
+        ('leg_circumference', "Leg Circumference"),
+        ('calf_circumference', "Calf Circumference"),
+    )
+
+    def draw(self, fig, ax):
+        days = self.days
+        for field, label in self.CIRCUMFERENCES:
+            ax.plot(days, self.values(field), label=label)
+        ax.set_title("Dynamic Body Metrics Tracker")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Value (%)")
+        ax.legend()
+        ax.grid(True)
+
+
+# Conditional
+
+class ConditionalChart(Chart):
+
+    @property
+    def days(self):
+        # Conditional rows already carry datetimes
+        return [row['created_at'] for row in self.rows]
+
+class DailySeriesChart(ConditionalChart):
+    """One conditional metric per day, drawn with plot/bar/scatter."""
+
+    field = None
+    title = None
+    ylabel = None
+    grid_axis = 'both'
+    legend = False
+
+    def draw(self, fig, ax):
+        days = self.days
+        self.draw_series(ax, days, self.values(self.field))
+        ax.set_title(self.title, fontsize=16, fontweight='bold')
+        ax.set_xlabel('Days', fontsize=10)
+        ax.set_ylabel(self.ylabel, fontsize=14)
+        _day_ticks(ax, days)
+        ax.tick_params(axis='y', labelsize=12)
+        ax.grid(True, axis=self.grid_axis)
+        if self.legend:
+            ax.legend()
+        fig.tight_layout()
+
+    def draw_series(self, ax, days, values):
+        raise NotImplementedError
+
+@chart('conditional', "VO2 Max Progression Over 30 Days")
+class VO2MaxChart(DailySeriesChart):
+    field = 'vo2_max'
+    title = 'VO₂ Max Over 30 Days'
+    ylabel = 'VO₂ Max (ml/kg/min)'
+    legend = True
+
+    def draw_series(self, ax, days, values):
+        ax.plot(days, values, marker='o', label="VO₂ Max (ml/kg/min)", color='blue')
+
+@chart('conditional', "Daily Lactate Levels Monitoring")
+class LactateLevelsChart(DailySeriesChart):
+    field = 'lactate_levels'
+    title = 'Lactate Levels Over 30 Days'
+    ylabel = 'Lactate Levels (mmol/L)'
+    grid_axis = 'y'
+
+    def draw_series(self, ax, days, values):
+        ax.bar(days, values, color='orange')
+
+@chart('conditional', "Training Intensity Progression")
+class TrainingIntensityChart(DailySeriesChart):
+    field = 'training_intensity'
+    title = 'Training Intensity Over 30 Days'
+    ylabel = 'Training Intensity'
+    legend = True
+
+    def draw_series(self, ax, days, values):
+        ax.plot(days, values, marker='o', label='Training Intensity', color='green')
+
+@chart('conditional', "Recovery Distribution")
+class RecoveryChart(DailySeriesChart):
+    field = 'recovery_times'
+    title = 'Recovery Times Over 30 Days'
+    ylabel = 'Recovery Times (hours)'
+
+    def draw_series(self, ax, days, values):
+        ax.scatter(days, values, color='purple', s=100)
+
+@chart('conditional', "VO2 Max Trend with Regression")
+class VO2MaxTrendChart(ConditionalChart):
+
+    def draw(self, fig, ax):
+        days = self.days
+        # Gün cinsinden farkları hesapla
+        days_numeric = np.array([(day - days[0]).days for day in days])
+        vo2_max_values = np.array(self.values('vo2_max'))
+
+        # En küçük kareler doğrusu
+        slope, intercept = least_squares(days_numeric, vo2_max_values)
+        predictions = trend_values(days_numeric, slope, intercept)
+
+        ax.plot(days_numeric, vo2_max_values, marker='o', label='VO₂ Max (ml/kg/min)', color='blue')
+        ax.plot(days_numeric, predictions, label='Trend Line', color='red', linestyle='--')
+        ax.set_title('VO₂ Max Trend Over 30 Days', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Days', fontsize=14)
+        ax.set_ylabel('VO₂ Max (ml/kg/min)', fontsize=14)
+        ax.tick_params(labelsize=12)
+        ax.grid(True)
+        ax.legend()
+        fig.tight_layout()
+
+@chart('conditional', "Conditional Goal Progress Overview")
+class GoalProgressChart(ConditionalChart):
+    figsize = (10, 6)
+
+    def draw(self, fig, ax):
+        # Hedef ve mevcut değerler
+        goals = ['VO2 Max', 'Lactate Levels', 'Muscle Strength']
+        current_values = [np.mean(self.values(field)) for field in
+                          ('current_vo2_max', 'current_lactate_levels', 'current_muscle_strength')]
+        target_values = [np.mean(self.values(field)) for field in
+                         ('target_vo2_max', 'target_lactate_level', 'target_muscle_strength')]
+
+        # X ekseninde çubuklar için pozisyonlar
+        x = np.arange(len(goals))
+        width = 0.35  # Çubuk genişliği
+
+        ax.bar(x - width/2, current_values, width, label='Current Values', color='lightblue')
+        ax.bar(x + width/2, target_values, width, label='Target Values', color='lightgreen')
+
+        ax.set_title('Conditional Goal Progress Overview', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Goals', fontsize=14)
+        ax.set_ylabel('Values', fontsize=14)
+        ax.set_xticks(x, goals, fontsize=12)
+        ax.tick_params(axis='y', labelsize=12)
+        ax.grid(axis='y', linestyle='--', alpha=0.7)
+        ax.legend(fontsize=12)
+        fig.tight_layout()
+
+
+# Endurance
+
+@chart('endurance', "Key Endurance Metrics Overview")
+class KeyEnduranceMetricsChart(Chart):
+    layout = (1, 3)
+    # (field, title, x range, label offset, color)
+    CARDS = (
+        ('running_distance', 'Average Running Distance (km)', (0, 10), 0.1, 'lightblue'),
+        ('average_speed', 'Average Speed (km/h)', (0, 15), 0.1, 'lightgreen'),
+        ('heart_rate', 'Average Heart Rate (bpm)', (100, 200), 1, 'salmon'),
+    )
+
+    def draw(self, fig, axes):
+        for ax, (field, title, xlim, offset, color) in zip(axes, self.CARDS):
+            mean = np.mean(self.values(field))
+            ax.barh(['Player'], [mean], color=color)
+            ax.set_xlim(*xlim)
+            ax.set_title(title, fontsize=14)
+            ax.text(mean + offset, 0, f"{mean:.2f}", va='center')
+        fig.tight_layout()
+
+@chart('endurance', "Endurance Trends")
+class EnduranceTrendsChart(Chart):
+
+    def draw(self, fig, ax):
+        days = self.days
+        ax.plot(days, self.values('running_distance'), marker='o', color='royalblue', label='Running Distance (km)')
+        ax.plot(days, self.values('average_speed'), marker='o', color='orange', label='Average Speed (km/h)')
+        ax.plot(days, self.values('heart_rate'), marker='o', color='red', label='Heart Rate (bpm)')
+        ax.set_title('Endurance Metrics Over 30 Days', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Days', fontsize=10)
+        ax.set_ylabel('Values', fontsize=14)
+        _day_ticks(ax, days)
+        ax.tick_params(axis='y', labelsize=10)
+        ax.legend()
+        ax.grid()
+        fig.tight_layout()
+
+@chart('endurance', "Peak Heart Rate Focused Endurance Development")
+class PeakHeartRateChart(Chart):
+    style = GGPLOT
+
+    def draw(self, fig, ax):
+        session_values = self.values('session')
+        peak_heart_rate_values = self.values('peak_heart_rate')
+        mean = np.mean(peak_heart_rate_values)
+
+        bars = ax.bar(session_values, peak_heart_rate_values, color='slateblue', width=0.6, edgecolor='black', linewidth=self.style.patch_linewidth)
+        ax.axhline(y=mean, color='r', linestyle='--', label=f'Mean: {mean:.2f} bpm')
+
+        ax.set_title('Peak Heart Rate Development Over 10 Sessions', fontsize=18, fontweight='bold')
+        ax.set_xlabel('Sessions', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Peak Heart Rate (bpm)', fontsize=14, fontweight='bold')
+        ax.set_xticks(session_values)
+        ax.tick_params(labelsize=12)
+        ax.grid(True, linestyle=':', color='gray', alpha=0.6)
+
+        # Adding value labels on top of the bars for clarity
+        for bar in bars:
+            yval = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width() / 2, yval + 2, round(yval, 1), ha='center', va='bottom', fontsize=10)
+
+        self.style.legend(ax, loc='upper left', fontsize=12)
+        fig.tight_layout()
+
+@chart('endurance', "Performance Radar")
+class PerformanceRadarChart(Chart):
+    figsize = (8, 5)
+    polar = True
+    FIELDS = ('running_distance', 'average_speed', 'heart_rate')
+
+    def draw(self, fig, ax):
+        # Oyuncunun verileri
+        player_values = [np.mean(self.values(field)) for field in self.FIELDS]
+
+        # Diğer oyuncuların ortalamaları (veriler controller tarafından sorgulanır)
+        other_players_values = []
+        for field in self.FIELDS:
+            values = [item[field] for item in self.other_players_data]
+            other_players_values.append(np.mean(values) if values else 0)
+
+        # Radar grafiği için kategoriler ve açılar
+        categories = ['Running Distance (km)', 'Average Speed (km/h)', 'Heart Rate (bpm)']
+        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+
+        # Verileri çemberin kapatılması için döngüyü tamamla
+        player_values += player_values[:1]
+        other_players_values += other_players_values[:1]
+        angles += angles[:1]
+
+        ax.fill(angles, player_values, color='blue', alpha=0.25, label='Player')
+        ax.fill(angles, other_players_values, color='red', alpha=0.25, label='Team Average')
+
+        ax.set_yticklabels([])
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(categories, fontsize=12)
+        ax.set_title('Endurance Comparison (Radar Chart)', fontsize=16, fontweight='bold')
+        ax.legend(loc='upper right', bbox_to_anchor=(1.1, 1.1))
+
+        # Arka plan olmadan göster
+        ax.spines['polar'].set_visible(False)
+        fig.tight_layout()
@@ -0,0 +1,289 @@
+# backend/services/graph_series.py
+"""Chart series for clients that draw graphs natively (format=data).
+
+build_series returns the same numbers the PNG renderer plots (days, metric
+arrays, targets, percentages, regression line) as plain JSON-friendly values,
+without going through matplotlib.
+"""
+import math
+import numpy as np
+
+from services.trends import least_squares
+
+# Physical targets sit this far above the best value in the selected range
+PHYSICAL_TARGET_MARGIN = 0.10
+
+PHYSICAL_PROGRESS_METRICS = {
+    "Muscle Mass (kg)": 'muscle_mass',
+    "Muscle Strength (kg)": 'muscle_strength',
+    "Muscle Endurance (reps)": 'muscle_endurance',
+    "Flexibility (cm)": 'flexibility',
+}
+
+BODY_CIRCUMFERENCES = {
+    "Thigh Circumference": 'thigh_circumference',
+    "Shoulder Circumference": 'shoulder_circumference',
+    "Arm Circumference": 'arm_circumference',
+    "Chest Circumference": 'chest_circumference',
+    "Back Circumference": 'back_circumference',
+    "Waist Circumference": 'waist_circumference',
+    "Leg Circumference": 'leg_circumference',
+    "Calf Circumference": 'calf_circumference',
+}
+
+ENDURANCE_METRICS = {
+    "Running Distance (km)": 'running_distance',
+    "Average Speed (km/h)": 'average_speed',
+    "Heart Rate (bpm)": 'heart_rate',
+}
+
+# Columns each graph reads from the rows (the services load only these)
+GRAPH_FIELDS = {
+    'physical': {
+        "Physical Progress Tracker": tuple(PHYSICAL_PROGRESS_METRICS.values()),
+        "Training Progress Time Tracker": tuple(PHYSICAL_PROGRESS_METRICS.values()),
+        "Body Composition Progress Tracker": ('weight', 'heights', 'muscle_mass'),
+        "Athletic Performance Radar Analysis": tuple(PHYSICAL_PROGRESS_METRICS.values()),
+        "BMI Distribution Analysis": ('weight', 'heights'),
+        "Comprehensive Physical Metrics Box Plot": tuple(PHYSICAL_PROGRESS_METRICS.values()) + ('weight', 'heights'),
+        "Dynamic Body Metrics Tracker": tuple(BODY_CIRCUMFERENCES.values()),
+    },
+    'conditional': {
+        "VO2 Max Progression Over 30 Days": ('vo2_max',),
+        "Daily Lactate Levels Monitoring": ('lactate_levels',),
+        "Training Intensity Progression": ('training_intensity',),
+        "Recovery Distribution": ('recovery_times',),
+        "VO2 Max Trend with Regression": ('vo2_max',),
+        "Conditional Goal Progress Overview": (
+            'current_vo2_max', 'current_lactate_levels', 'current_muscle_strength',
+            'target_vo2_max', 'target_lactate_level', 'target_muscle_strength'
+        ),
+    },
+    'endurance': {
+        "Key Endurance Metrics Overview": tuple(ENDURANCE_METRICS.values()),
+        "Endurance Trends": tuple(ENDURANCE_METRICS.values()),
+        "Peak Heart Rate Focused Endurance Development": ('session', 'peak_heart_rate'),
+        "Performance Radar": tuple(ENDURANCE_METRICS.values()),
+    },
+}
+
+def graph_fields(domain, graph_type):
+    """Columns graph_type needs, or None if it is not a known graph."""
+    return GRAPH_FIELDS.get(domain, {}).get(graph_type)
+
+def physical_targets(metrics):
+    """Target per metric: best recorded value plus PHYSICAL_TARGET_MARGIN, rounded up.
+
+    Missing (None) values are skipped. The target is at least 1, so a metric
+    that never rose above 0 shows 0% instead of dividing by zero.
+    Deterministic, so the same rows always produce the same chart.
+    """
+    return {
+        metric: max(1, math.ceil(max(_present(values), default=0) * (1 + PHYSICAL_TARGET_MARGIN)))
+        for metric, values in metrics.items()
+    }
+
+def target_percentage(value, target):
+    """value as a percentage of target (None stays None)."""
+    return None if value is None else value / target * 100
+
+def convert_height_to_float(height_str):
+    if height_str:
+        # Remove 'm' or 'cm' units and strip spaces
+        height_str = height_str.replace("m", "").replace("cm", "").strip()
+        # Replace commas with dots
+        height_str = height_str.replace(",", ".")
+        try:
+            return float(height_str)
+        except ValueError:
+            return 0.0  # Return 0.0 in case of invalid value
+    return 0.0
+
+def build_series(domain, graph_type, rows, other_players_data=None):
+    """Return the plotted series of domain/graph_type as a JSON-serializable dict."""
+    if domain == 'physical':
+        series = _physical_series(graph_type, rows)
+    elif domain == 'conditional':
+        series = _conditional_series(graph_type, rows)
+    elif domain == 'endurance':
+        series = _endurance_series(graph_type, rows, other_players_data)
+    else:
+        raise ValueError(f'Unknown graph domain: {domain}')
+    return {'domain': domain, 'graph_type': graph_type, **series}
+
+def _day(value):
+    # Conditional rows carry datetimes, the others '%Y-%m-%d' strings
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else value
+
+def _column(rows, key):
+    return [row[key] for row in rows]
+
+def _present(values):
+    return [value for value in values if value is not None]
+
+def _mean(values):
+    # Boş (None) ölçümler ortalamaya katılmaz
+    values = _present(values)
+    return float(np.mean(values)) if values else 0.0
+
+def _bmi(rows):
+    return [row['weight'] / (convert_height_to_float(row['heights']) ** 2) for row in rows]
+
+def _summary(values):
+    # Box plot istatistikleri
+    q1, median, q3 = (float(v) for v in np.percentile(values, [25, 50, 75]))
+    return {'min': float(min(values)), 'q1': q1, 'median': median, 'q3': q3, 'max': float(max(values))}
+
+def _physical_series(graph_type, rows):
+    days = [_day(row['created_at']) for row in rows]
+
+    if graph_type in ("Physical Progress Tracker", "Training Progress Time Tracker"):
+        metrics = {label: _column(rows, key) for label, key in PHYSICAL_PROGRESS_METRICS.items()}
+        targets = physical_targets(metrics)
+
+        if graph_type == "Physical Progress Tracker":
+            cards = []
+            for label, values in metrics.items():
+                average = _mean(values)
+                cards.append({
+                    'metric': label,
+                    'average': average,
+                    'target': targets[label],
+                    'percentage': target_percentage(average, targets[label])
+                })
+            return {'chart': 'cards', 'metrics': cards}
+
+        return {
+            'chart': 'line',
+            'days': days,
+            'targets': targets,
+            'series': {
+                label: [target_percentage(value, targets[label]) for value in values] for label, values in metrics.items()
+            }
+        }
+
+    elif graph_type == "Body Composition Progress Tracker":
+        return {
+            'chart': 'area',
+            'days': days,
+            'series': {
+                'Weight (kg)': _column(rows, 'weight'),
+                'Height (cm)': [convert_height_to_float(row['heights']) for row in rows],
+                'Muscle Mass (kg)': _column(rows, 'muscle_mass')
+            }
+        }
+
+    elif graph_type == "Athletic Performance Radar Analysis":
+        return {
+            'chart': 'radar',
+            'labels': list(PHYSICAL_PROGRESS_METRICS),
+            'values': [_mean(_column(rows, key)) for key in PHYSICAL_PROGRESS_METRICS.values()]
+        }
+
+    elif graph_type == "BMI Distribution Analysis":
+        bmi_values = _bmi(rows)
+        counts, edges = np.histogram(bmi_values, bins=10)
+        return {
+            'chart': 'histogram',
+            'values': bmi_values,
+            'counts': counts.tolist(),
+            'bin_edges': edges.tolist()
+        }
+
+    elif graph_type == "Comprehensive Physical Metrics Box Plot":
+        series = {label: _column(rows, key) for label, key in PHYSICAL_PROGRESS_METRICS.items()}
+        series['BMI'] = _bmi(rows)
+        return {
+            'chart': 'box',
+            'series': series,
+            'summary': {label: _summary(values) for label, values in series.items()}
+        }
+
+    elif graph_type == "Dynamic Body Metrics Tracker":
+        return {
+            'chart': 'line',
+            'days': days,
+            'series': {label: _column(rows, key) for label, key in BODY_CIRCUMFERENCES.items()}
+        }
+
+    raise ValueError(f'Unknown graph type: {graph_type}')
+
+def _conditional_series(graph_type, rows):
+    days = [_day(row['created_at']) for row in rows]
+
+    if graph_type == "VO2 Max Progression Over 30 Days":
+        return {'chart': 'line', 'days': days, 'series': {'VO₂ Max (ml/kg/min)': _column(rows, 'vo2_max')}}
+
+    elif graph_type == "Daily Lactate Levels Monitoring":
+        return {'chart': 'bar', 'days': days, 'series': {'Lactate Levels (mmol/L)': _column(rows, 'lactate_levels')}}
+
+    elif graph_type == "Training Intensity Progression":
+        return {'chart': 'line', 'days': days, 'series': {'Training Intensity': _column(rows, 'training_intensity')}}
+
+    elif graph_type == "Recovery Distribution":
+        return {'chart': 'scatter', 'days': days, 'series': {'Recovery Times (hours)': _column(rows, 'recovery_times')}}
+
+    elif graph_type == "VO2 Max Trend with Regression":
+        first_day = rows[0]['created_at']
+        days_numeric = [(row['created_at'] - first_day).days for row in rows]
+        vo2_max_values = _column(rows, 'vo2_max')
+
+        # En küçük kareler doğrusu (tek ölçümde yatay çizgi)
+        slope, intercept = (float(v) for v in least_squares(days_numeric, vo2_max_values))
+
+        return {
+            'chart': 'line',
+            'days': days,
+            'x': days_numeric,
+            'series': {
+                'VO₂ Max (ml/kg/min)': vo2_max_values,
+                'Trend Line': [slope * x + intercept for x in days_numeric]
+            },
+            'regression': {'slope': slope, 'intercept': intercept}
+        }
+
+    elif graph_type == "Conditional Goal Progress Overview":
+        return {
+            'chart': 'grouped_bar',
+            'goals': ['VO2 Max', 'Lactate Levels', 'Muscle Strength'],
+            'current': [_mean(_column(rows, key)) for key in ('current_vo2_max', 'current_lactate_levels', 'current_muscle_strength')],
+            'target': [_mean(_column(rows, key)) for key in ('target_vo2_max', 'target_lactate_level', 'target_muscle_strength')]
+        }
+
+    raise ValueError(f'Unknown graph type: {graph_type}')
+
+def _endurance_series(graph_type, rows, other_players_data=None):
+    days = [_day(row['created_at']) for row in rows]
+
+    if graph_type == "Key Endurance Metrics Overview":
+        return {
+            'chart': 'cards',
+            'metrics': [{'metric': label, 'average': _mean(_column(rows, key))} for label, key in ENDURANCE_METRICS.items()]
+        }
+
+    elif graph_type == "Endurance Trends":
+        return {
+            'chart': 'line',
+            'days': days,
+            'series': {label: _column(rows, key) for label, key in ENDURANCE_METRICS.items()}
+        }
+
+    elif graph_type == "Peak Heart Rate Focused Endurance Development":
+        peak_heart_rate_values = _column(rows, 'peak_heart_rate')
+        return {
+            'chart': 'bar',
+            'sessions': _column(rows, 'session'),
+            'series': {'Peak Heart Rate (bpm)': peak_heart_rate_values},
+            'mean': _mean(peak_heart_rate_values)
+        }
+
+    elif graph_type == "Performance Radar":
+        other_players_data = other_players_data or []
+        return {
+            'chart': 'radar',
+            'labels': list(ENDURANCE_METRICS),
+            'player': [_mean(_column(rows, key)) for key in ENDURANCE_METRICS.values()],
+            'team_average': [_mean(_column(other_players_data, key)) for key in ENDURANCE_METRICS.values()]
+        }
+
+    raise ValueError(f'Unknown graph type: {graph_type}')
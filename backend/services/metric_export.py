@@ -0,0 +1,118 @@
+# backend/services/metric_export.py
+"""Streaming CSV/NDJSON export shared by the physical, conditional and endurance services.
+
+Rows are fetched in batches of EXPORT_BATCH_ROWS through a server-side
+cursor (yield_per) as plain column tuples, and every batch is written out
+before the next one is fetched, so memory use does not depend on how much
+history is exported.
+"""
+from datetime import datetime
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import select
+from models.footballer import Footballer
+
+EXPORT_BATCH_ROWS = int(os.getenv('EXPORT_BATCH_ROWS', 1000))
+
+# format -> mimetype
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+def resolve_scope(authorization, user_id, team_id=None, league_id=None, footballer_id=None):
+    """Check access and return the (team_id, league_id, footballer_id) filters to apply.
+
+    Non-admin users are limited to their own team. Raises PermissionError.
+    """
+    access = authorization.get_user_access(user_id)
+    if not access:
+        raise PermissionError('User not found!')
+
+    if footballer_id is not None and not authorization.can_access_footballer(user_id, footballer_id):
+        raise PermissionError('Access denied! You can only access footballers from your assigned team.')
+
+    if not access.is_admin:
+        if team_id is not None and team_id != access.team_id:
+            raise PermissionError('Access denied! You can only access your assigned team.')
+        team_id = access.team_id
+        if team_id is None:
+            raise PermissionError('Access denied! No team assigned.')
+
+    return team_id, league_id, footballer_id
+
+def _parse_date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Invalid {name}, expected YYYY-MM-DD')
+
+def export(session, authorization, model, fields, user_id, file_format,
+           team_id=None, league_id=None, footballer_id=None, start_date=None, end_date=None):
+    """Return a generator of CSV/NDJSON text chunks for the matching rows.
+
+    Access and arguments are checked before the generator is returned
+    (PermissionError / ValueError); the query runs while it is consumed.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported export format: {file_format}. Use csv or ndjson')
+
+    team_id, league_id, footballer_id = resolve_scope(authorization, user_id, team_id, league_id, footballer_id)
+    start = _parse_date(start_date, 'start_date')
+    end = _parse_date(end_date, 'end_date')
+
+    columns = ['id', 'footballer_id', 'entry_date', 'created_at'] + list(fields)
+    query = select(*[getattr(model, column) for column in columns])
+
+    if team_id is not None or league_id is not None:
+        query = query.join(Footballer, Footballer.footballer_id == model.footballer_id)
+        if team_id is not None:
+            query = query.where(Footballer.team_id == team_id)
+        if league_id is not None:
+            query = query.where(Footballer.league_id == league_id)
+    if footballer_id is not None:
+        query = query.where(model.footballer_id == footballer_id)
+    if start:
+        query = query.where(model.entry_date >= start)
+    if end:
+        query = query.where(model.entry_date <= end)
+
+    # Index sırası: (footballer_id, created_at)
+    query = query.order_by(model.footballer_id, model.created_at, model.id)
+
+    writer = _csv_batches if file_format == 'csv' else _ndjson_batches
+    return writer(session, query, columns)
+
+def _batches(session, query):
+    result = session.execute(query.execution_options(yield_per=EXPORT_BATCH_ROWS))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+def _csv_batches(session, query, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in _batches(session, query):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _ndjson_batches(session, query, columns):
+    for rows in _batches(session, query):
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=_json_default) + '\n' for row in rows)
+
+def _json_default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
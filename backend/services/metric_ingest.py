@@ -0,0 +1,93 @@
+# backend/services/metric_ingest.py
+"""Bulk ingestion shared by the physical, conditional and endurance services.
+
+A batch is validated up front, access to all of its footballers is checked
+with one query, and the rows are written with a single multi-row
+INSERT ... ON CONFLICT in one transaction.
+"""
+from datetime import datetime
+import os
+
+from utils.database import upsert_rows
+
+MAX_BULK_ENTRIES = int(os.getenv('BULK_MAX_ENTRIES', 500))
+
+def build_rows(entries, fields, max_entries=MAX_BULK_ENTRIES):
+    """Validate bulk entries and turn them into insert rows.
+
+    Each entry needs a footballer_id and may carry a 'created_at' date
+    (YYYY-MM-DD, defaults to now). Returns (rows, error).
+    """
+    if not isinstance(entries, list) or not entries:
+        return None, "entries must be a non-empty list"
+    if max_entries and len(entries) > max_entries:
+        return None, f"At most {max_entries} entries are allowed per request"
+
+    now = datetime.utcnow()
+    rows = []
+    seen = set()
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            return None, f"Entry {index} must be an object"
+
+        try:
+            footballer_id = int(entry.get('footballer_id'))
+        except (TypeError, ValueError):
+            return None, f"Entry {index} has an invalid footballer_id"
+
+        if entry.get('created_at'):
+            try:
+                created_at = datetime.strptime(entry['created_at'], '%Y-%m-%d')
+            except (TypeError, ValueError):
+                return None, f"Entry {index} has an invalid created_at, expected YYYY-MM-DD"
+        else:
+            created_at = now
+
+        # Aynı oyuncu için aynı gün iki kez gönderilemez
+        key = (footballer_id, created_at.date())
+        if key in seen:
+            return None, f"Entry {index} duplicates footballer {footballer_id} on {key[1]}"
+        seen.add(key)
+
+        row = {field: entry.get(field) for field in fields}
+        row.update(
+            footballer_id=footballer_id,
+            created_at=created_at,
+            entry_date=created_at.date(),
+            timestamp=now
+        )
+        rows.append(row)
+    return rows, None
+
+def ingest(session, authorization, model, fields, entries, user_id, upsert=False, max_entries=MAX_BULK_ENTRIES):
+    """Validate, authorize and write a batch of metric entries.
+
+    Returns (result, message) like the single-entry add methods; raises
+    PermissionError if the user cannot access one of the footballers.
+    """
+    rows, error = build_rows(entries, fields, max_entries=max_entries)
+    if error:
+        return None, error
+
+    if not authorization.can_access_footballers(user_id, [row['footballer_id'] for row in rows]):
+        raise PermissionError('Access denied! You can only add data for footballers from your assigned team.')
+
+    try:
+        ids = []
+        # Statements stay below the bind parameter limits; one transaction overall
+        for start in range(0, len(rows), MAX_BULK_ENTRIES):
+            ids.extend(upsert_rows(
+                session, model, rows[start:start + MAX_BULK_ENTRIES], ['footballer_id', 'entry_date'],
+                update_columns=tuple(fields) + ('timestamp',) if upsert else None
+            ))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        return None, str(e)
+
+    # Without upsert, entries for days that already have data are skipped
+    return {
+        'saved': len(ids),
+        'skipped': len(rows) - len(ids),
+        'ids': ids
+    }, f"{len(ids)} entries saved"
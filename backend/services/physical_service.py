@@ -1,16 +1,34 @@
 # backend/services/physical_service.py
 from datetime import datetime
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
 from models.league import League
 from models.football_team import FootballTeam
 from models.footballer import Footballer
 from models.physical import Physical
-from models.user import User
+from services.authorization_service import AuthorizationService
+from utils.database import upsert_rows
+from utils.pagination import keyset_page
+from utils.serialization import serialize_rows, date_string
+from services import metric_ingest, metric_export, graph_series
 from sqlalchemy.orm import Session
 
 class PhysicalService:
+    # Columns written by add/bulk add; also updated on upsert conflicts
+    METRIC_FIELDS = (
+        'muscle_mass', 'muscle_strength', 'muscle_endurance', 'flexibility', 'weight',
+        'body_fat_percentage', 'heights', 'thigh_circumference', 'shoulder_circumference',
+        'arm_circumference', 'chest_circumference', 'back_circumference', 'waist_circumference',
+        'leg_circumference', 'calf_circumference'
+    )
+    # Columns of the history endpoint
+    HISTORY_FIELDS = (
+        'muscle_mass', 'muscle_strength', 'muscle_endurance', 'flexibility', 'weight',
+        'body_fat_percentage', 'heights'
+    )
+
     def __init__(self, session: Session):
         self.session = session
+        self.authorization = AuthorizationService(session)
 
     def get_all_leagues(self):
         """Get all leagues available in the database."""
@@ -20,7 +38,7 @@ class PhysicalService:
     def get_teams_by_league(self, league_id, user_id=None):
         """Get all teams in a specific league that user can access."""
         if user_id:
-            user = self.session.query(User).filter(User.id == user_id).first()
+            user = self.authorization.get_user_access(user_id)
             if user and not user.is_admin and user.team_id:
                 # Non-admin users can only see their assigned team
                 teams = self.session.query(FootballTeam).filter(
@@ -37,7 +55,7 @@ class PhysicalService:
     def get_footballers_by_team(self, team_id, user_id=None):
         """Get all footballers in a specific team that user can access."""
         if user_id:
-            user = self.session.query(User).filter(User.id == user_id).first()
+            user = self.authorization.get_user_access(user_id)
             if user and not user.is_admin:
                 try:
                     # Convert both to strings for comparison to avoid type issues
@@ -64,44 +82,50 @@ class PhysicalService:
             "market_value": f.market_value
         } for f in footballers]
 
-    def get_physical_data(self, footballer_id, graph_type=None, start_date=None, end_date=None):
-        """Get physical data for a footballer within a date range."""
-        query = self.session.query(Physical).filter(Physical.footballer_id == footballer_id)
-        
+    def _data_columns(self, graph_type=None, fields=None):
+        """Columns to load: the requested fields, else the ones graph_type draws, else all."""
+        if fields:
+            unknown = [field for field in fields if field not in self.METRIC_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            # Tekrarlanan alanlar bir kez, METRIC_FIELDS sırasıyla yüklenir
+            names = [field for field in self.METRIC_FIELDS if field in fields]
+        else:
+            names = graph_series.graph_fields('physical', graph_type) or self.METRIC_FIELDS
+        return self._entry_columns(names)
+
+    def _data_query(self, footballer_id, start_date=None, end_date=None, graph_type=None, fields=None):
+        # Read-only: plain row tuples, no ORM entities
+        query = select(*self._data_columns(graph_type, fields)).where(Physical.footballer_id == footballer_id)
         if start_date and end_date:
-            query = query.filter(Physical.created_at.between(start_date, end_date))
+            query = query.where(Physical.created_at.between(start_date, end_date))
+        return query
+
+    def get_physical_data(self, footballer_id, graph_type=None, start_date=None, end_date=None, fields=None):
+        """Get physical data for a footballer within a date range.
+
+        Only the columns graph_type draws (or the given fields) are loaded.
+        """
+        query = self._data_query(footballer_id, start_date, end_date, graph_type, fields)
         
         # Order by date
         query = query.order_by(Physical.created_at)
         
-        results = query.all()
-        
         # Convert to list of dictionaries
-        formatted_results = []
-        for result in results:
-            formatted_result = {
-                'id': result.id,
-                'footballer_id': result.footballer_id,
-                'muscle_mass': result.muscle_mass,
-                'muscle_strength': result.muscle_strength,
-                'muscle_endurance': result.muscle_endurance,
-                'flexibility': result.flexibility,
-                'weight': result.weight,
-                'body_fat_percentage': result.body_fat_percentage,
-                'heights': result.heights,
-                'thigh_circumference': result.thigh_circumference,
-                'shoulder_circumference': result.shoulder_circumference,
-                'arm_circumference': result.arm_circumference,
-                'chest_circumference': result.chest_circumference,
-                'back_circumference': result.back_circumference,
-                'waist_circumference': result.waist_circumference,
-                'leg_circumference': result.leg_circumference,
-                'calf_circumference': result.calf_circumference,
-                'created_at': result.created_at.strftime('%Y-%m-%d')
-            }
-            formatted_results.append(formatted_result)
-        
-        return formatted_results
+        return self._serialize(query, self.session.execute(query))
+
+    def _serialize(self, query, rows):
+        return serialize_rows(rows, query.selected_columns.keys(), created_at=date_string)
+
+    def _entry_columns(self, fields=None):
+        names = ('id', 'footballer_id') + tuple(fields or self.METRIC_FIELDS) + ('created_at',)
+        return [getattr(Physical, name) for name in names]
+
+    def get_physical_data_page(self, footballer_id, page_size, cursor=None, start_date=None, end_date=None, fields=None):
+        """Get one keyset page of get_physical_data (oldest first)."""
+        query = self._data_query(footballer_id, start_date, end_date, fields=fields)
+        rows, next_cursor = keyset_page(self.session, query, Physical, page_size, cursor)
+        return {'items': self._serialize(query, rows), 'next_cursor': next_cursor}
 
     def get_physical_entry_by_date(self, footballer_id, date):
         """Get physical data for a footballer on a specific date."""
@@ -110,104 +134,79 @@ class PhysicalService:
             start_date = datetime.strptime(f"{date} 00:00:00", '%Y-%m-%d %H:%M:%S')
             end_date = datetime.strptime(f"{date} 23:59:59", '%Y-%m-%d %H:%M:%S')
             
-            physical_entry = self.session.query(Physical).filter(
+            query = select(*self._entry_columns()).where(
                 and_(
                     Physical.footballer_id == footballer_id,
                     Physical.created_at >= start_date,
                     Physical.created_at <= end_date
                 )
-            ).first()
+            ).limit(1)
+            rows = self.session.execute(query).all()
             
-            if physical_entry:
-                return {
-                    'id': physical_entry.id,
-                    'footballer_id': physical_entry.footballer_id,
-                    'muscle_mass': physical_entry.muscle_mass,
-                    'muscle_strength': physical_entry.muscle_strength,
-                    'muscle_endurance': physical_entry.muscle_endurance,
-                    'flexibility': physical_entry.flexibility,
-                    'weight': physical_entry.weight,
-                    'body_fat_percentage': physical_entry.body_fat_percentage,
-                    'heights': physical_entry.heights,
-                    'thigh_circumference': physical_entry.thigh_circumference,
-                    'shoulder_circumference': physical_entry.shoulder_circumference,
-                    'arm_circumference': physical_entry.arm_circumference,
-                    'chest_circumference': physical_entry.chest_circumference,
-                    'back_circumference': physical_entry.back_circumference,
-                    'waist_circumference': physical_entry.waist_circumference,
-                    'leg_circumference': physical_entry.leg_circumference,
-                    'calf_circumference': physical_entry.calf_circumference,
-                    'created_at': physical_entry.created_at.strftime('%Y-%m-%d')
-                }
+            if rows:
+                return self._serialize(query, rows)[0]
             
-            # Veri bulunamazsa boş bir veri seti döndür
-            return {
-                'id': None,
-                'footballer_id': footballer_id,
-                'muscle_mass': None,
-                'muscle_strength': None,
-                'muscle_endurance': None,
-                'flexibility': None,
-                'weight': None,
-                'body_fat_percentage': None,
-                'heights': None,
-                'thigh_circumference': None,
-                'shoulder_circumference': None,
-                'arm_circumference': None,
-                'chest_circumference': None,
-                'back_circumference': None,
-                'waist_circumference': None,
-                'leg_circumference': None,
-                'calf_circumference': None,
-                'created_at': date
-            }
+            # Veri bulunamazsa None döndür (controller boş template döndürür)
+            return None
             
         except Exception as e:
             print(f"Error in get_physical_entry_by_date: {str(e)}")
             return None
 
-    def add_physical_data(self, footballer_id, data):
+    def add_physical_data(self, footballer_id, data, upsert=False):
+        """Add physical data for a footballer on the selected date.
+
+        A single INSERT ... ON CONFLICT on (footballer_id, entry_date): an
+        existing entry for that day is rejected, or overwritten with upsert=True.
+        """
         try:
             selected_date = data.get('created_at', datetime.now().strftime('%Y-%m-%d'))
-            
-            # Seçilen tarih için kontrol yap
-            existing_entry = self.get_physical_entry_by_date(footballer_id, selected_date)
-            
-            if existing_entry:
-                return None, "Bu tarih için zaten veri mevcut"
+            created_at = datetime.strptime(selected_date, '%Y-%m-%d')
 
-            new_entry = Physical(
-                footballer_id=footballer_id,
-                created_at=datetime.strptime(selected_date, '%Y-%m-%d'),
-                muscle_mass=data.get('muscle_mass'),
-                muscle_strength=data.get('muscle_strength'),
-                muscle_endurance=data.get('muscle_endurance'),
-                flexibility=data.get('flexibility'),
-                weight=data.get('weight'),
-                body_fat_percentage=data.get('body_fat_percentage'),
-                heights=data.get('heights'),
-                thigh_circumference=data.get('thigh_circumference'),
-                shoulder_circumference=data.get('shoulder_circumference'),
-                arm_circumference=data.get('arm_circumference'),
-                chest_circumference=data.get('chest_circumference'),
-                back_circumference=data.get('back_circumference'),
-                waist_circumference=data.get('waist_circumference'),
-                leg_circumference=data.get('leg_circumference'),
-                calf_circumference=data.get('calf_circumference')
+            values = {field: data.get(field) for field in self.METRIC_FIELDS}
+            values.update(
+                footballer_id=int(footballer_id),
+                created_at=created_at,
+                entry_date=created_at.date(),
+                timestamp=datetime.utcnow()
             )
-            
-            self.session.add(new_entry)
+            ids = upsert_rows(
+                self.session, Physical, [values], ['footballer_id', 'entry_date'],
+                update_columns=self.METRIC_FIELDS + ('timestamp',) if upsert else None
+            )
+
+            # Seçilen tarih için kayıt zaten var
+            if not ids:
+                return None, "Bu tarih için zaten veri mevcut"
+
             self.session.commit()
-            
+
             return {
-                'id': new_entry.id,
-                'footballer_id': new_entry.footballer_id,
-                'created_at': new_entry.created_at.strftime('%Y-%m-%d')
+                'id': ids[0],
+                'footballer_id': values['footballer_id'],
+                'created_at': created_at.strftime('%Y-%m-%d')
             }, "Physical data added successfully"
-            
+
         except Exception as e:
             self.session.rollback()
-        return None, str(e)    
+            return None, str(e)
+
+    def add_physical_data_bulk(self, entries, user_id, upsert=False):
+        """Add physical data for many footballers in one transaction.
+
+        Raises PermissionError if user_id cannot access one of the footballers.
+        """
+        return metric_ingest.ingest(self.session, self.authorization, Physical, self.METRIC_FIELDS, entries, user_id, upsert=upsert)
+
+    def export_physical_data(self, user_id, file_format, team_id=None, league_id=None,
+                     footballer_id=None, start_date=None, end_date=None):
+        """Stream physical data as CSV/NDJSON chunks (see metric_export.export)."""
+        return metric_export.export(
+            self.session, self.authorization, Physical, self.METRIC_FIELDS, user_id, file_format,
+            team_id=team_id, league_id=league_id, footballer_id=footballer_id,
+            start_date=start_date, end_date=end_date
+        )
+
     def update_physical_data(self, entry_id, data, user_id=None):
         """Update existing physical data for a footballer."""
         try:
@@ -288,28 +287,23 @@ class PhysicalService:
             self.session.rollback()
             return False, str(e)
 
+    def _history_query(self, footballer_id):
+        return select(*self._entry_columns(self.HISTORY_FIELDS)).where(Physical.footballer_id == footballer_id)
+
     def get_physical_history(self, footballer_id, limit=10):
         """Get physical data history for a footballer."""
-        entries = self.session.query(Physical).filter(
-            Physical.footballer_id == footballer_id
-        ).order_by(Physical.created_at.desc()).limit(limit).all()
-        
-        return [{
-            'id': entry.id,
-            'footballer_id': entry.footballer_id,
-            'muscle_mass': entry.muscle_mass,
-            'muscle_strength': entry.muscle_strength,
-            'muscle_endurance': entry.muscle_endurance,
-            'flexibility': entry.flexibility,
-            'weight': entry.weight,
-            'body_fat_percentage': entry.body_fat_percentage,
-            'heights': entry.heights,
-            'created_at': entry.created_at.strftime('%Y-%m-%d')
-        } for entry in entries]
+        query = self._history_query(footballer_id).order_by(Physical.created_at.desc()).limit(limit)
+        return self._serialize(query, self.session.execute(query))
+
+    def get_physical_history_page(self, footballer_id, page_size, cursor=None):
+        """Get one keyset page of get_physical_history (newest first)."""
+        query = self._history_query(footballer_id)
+        rows, next_cursor = keyset_page(self.session, query, Physical, page_size, cursor, descending=True)
+        return {'items': self._serialize(query, rows), 'next_cursor': next_cursor}
 
     def can_access_entry(self, user_id, entry_id):
         """Check if user can access a specific physical data entry."""
-        user = self.session.query(User).filter(User.id == user_id).first()
+        user = self.authorization.get_user_access(user_id)
         if not user:
             return False
         
@@ -322,10 +316,8 @@ class PhysicalService:
         if not entry:
             return False
         
-        # Get footballer's team
-        footballer = self.session.query(Footballer).filter(Footballer.footballer_id == entry.footballer_id).first()
-        if not footballer:
-            return False
-        
         # Check if user's team matches footballer's team
-        return user.team_id == footballer.team_id
\ No newline at end of file
+        footballer_team_id = self.authorization.get_footballer_team_id(entry.footballer_id)
+        if footballer_team_id is None:
+            return False
+        return user.team_id == footballer_team_id
\ No newline at end of file
@@ -0,0 +1,110 @@
+# backend/services/trends.py
+"""Straight-line trends of metric series, in plain NumPy.
+
+Every function works along the last axis, so one call fits one series
+(shape (n,)) or a whole squad at once (shape (players, n)). Series of
+different lengths are padded with NaN (see pad_series); NaN samples are
+left out of every fit.
+
+A series with fewer than two distinct x values gets a flat line (slope 0)
+through its mean, or its median for the robust fit.
+"""
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+
+def pad_series(series):
+    """Stack (x, y) sequences of different lengths into NaN-padded (players, n) arrays."""
+    length = max((len(y) for _, y in series), default=0)
+    x = np.full((len(series), length), np.nan)
+    y = np.full((len(series), length), np.nan)
+    for index, (xs, ys) in enumerate(series):
+        x[index, :len(xs)] = xs
+        y[index, :len(ys)] = ys
+    return x, y
+
+def _prepare(x, y):
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return x, y, valid
+
+def _moments(x, y, valid):
+    # Ortalamalar ve merkezlenmiş kareler toplamı (NaN örnekler sayılmaz)
+    count = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(valid, x, 0.0).sum(axis=-1) / count
+        y_mean = np.where(valid, y, 0.0).sum(axis=-1) / count
+    dx = np.where(valid, x - x_mean[..., None], 0.0)
+    dy = np.where(valid, y - y_mean[..., None], 0.0)
+    return count, x_mean, y_mean, (dx * dx).sum(axis=-1), (dx * dy).sum(axis=-1)
+
+def least_squares(x, y):
+    """Closed-form least-squares line of y on x; returns (slope, intercept) arrays."""
+    x, y, valid = _prepare(x, y)
+    _, x_mean, y_mean, sxx, sxy = _moments(x, y, valid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+    return slope, y_mean - slope * x_mean
+
+def theil_sen(x, y):
+    """Robust line: median of the pairwise slopes, median residual as intercept.
+
+    Builds an (n, n) matrix of slopes per series, meant for the short daily
+    series of the dashboards rather than raw sensor samples.
+    """
+    x, y, valid = _prepare(x, y)
+    dx = x[..., None, :] - x[..., :, None]
+    dy = y[..., None, :] - y[..., :, None]
+    n = x.shape[-1]
+    pairs = np.triu(np.ones((n, n), dtype=bool), k=1) & valid[..., None, :] & valid[..., :, None] & (dx != 0)
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        # Hiç geçerli çifti olmayan seriler için "All-NaN slice" uyarısı
+        warnings.simplefilter('ignore', RuntimeWarning)
+        slopes = np.where(pairs, dy / dx, np.nan).reshape(x.shape[:-1] + (n * n,))
+        slope = np.nan_to_num(np.nanmedian(slopes, axis=-1), nan=0.0) if n else np.zeros(x.shape[:-1])
+        intercept = np.nanmedian(np.where(valid, y - slope[..., None] * x, np.nan), axis=-1)
+    return slope, intercept
+
+def fit_line(x, y, robust=False):
+    """(slope, intercept) of the trend of y over x; robust uses Theil-Sen."""
+    return theil_sen(x, y) if robust else least_squares(x, y)
+
+def trend_values(x, slope, intercept):
+    """Points of the fitted lines at x (x has the series' shape)."""
+    return np.asarray(slope)[..., None] * np.asarray(x, dtype=float) + np.asarray(intercept)[..., None]
+
+def rolling_slope(x, y, window):
+    """Least-squares slope over every window of `window` consecutive samples.
+
+    Returns shape (..., n - window + 1); empty if the series is shorter.
+    """
+    if window < 2:
+        raise ValueError('window must be at least 2')
+    x, y, _ = _prepare(x, y)
+    if x.shape[-1] < window:
+        return np.empty(x.shape[:-1] + (0,))
+    windows_x = np.lib.stride_tricks.sliding_window_view(x, window, axis=-1)
+    windows_y = np.lib.stride_tricks.sliding_window_view(y, window, axis=-1)
+    return least_squares(windows_x, windows_y)[0]
+
+def confidence_band(x, y, level=0.95):
+    """Lower and upper bound of the least-squares line's confidence interval at x.
+
+    Uses the normal quantile for `level` (no t-distribution without SciPy),
+    so bands of very short series are slightly narrow. Series with fewer than
+    three samples get NaN bounds.
+    """
+    x, y, valid = _prepare(x, y)
+    count, x_mean, _, sxx, _ = _moments(x, y, valid)
+    slope, intercept = least_squares(x, y)
+    fitted = trend_values(x, slope, intercept)
+
+    residuals = np.where(valid, y - fitted, 0.0)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.sqrt((residuals * residuals).sum(axis=-1) / (count - 2))
+        leverage = 1 / count[..., None] + (x - x_mean[..., None]) ** 2 / np.where(sxx > 0, sxx, np.inf)[..., None]
+        half_width = np.where((count > 2)[..., None], z * scale[..., None] * np.sqrt(leverage), np.nan)
+    return fitted - half_width, fitted + half_width
@@ -0,0 +1,24 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
+from app import app as flask_app
+from utils.database import create_tables
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    """A fresh SQLite file database used by every request of the test."""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setenv('DATABASE_URL', url)
+    create_tables(url)
+    return url
+
+@pytest.fixture
+def app(database_url):
+    flask_app.config.update(TESTING=True)
+    return flask_app
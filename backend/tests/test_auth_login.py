@@ -0,0 +1,49 @@
+# backend/tests/test_auth_login.py
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.user import User
+
+THREADS = 8
+LOGINS_PER_THREAD = 5
+
+def _register(client, username='coach', password='secret'):
+    response = client.post('/api/auth/register', json={
+        'username': username, 'email': f'{username}@example.com', 'password': password, 'role': 'coach'
+    })
+    assert response.status_code == 201, response.json
+
+def _stored_user(database_url, username='coach'):
+    with Session(create_engine(database_url)) as session:
+        return session.query(User).filter(User.username == username).one()
+
+def test_concurrent_logins_all_succeed_and_are_counted(app, database_url):
+    _register(app.test_client())
+
+    def login_many(_):
+        # Test client'lar thread-safe değil: her thread kendi client'ını kullanır
+        client = app.test_client()
+        return [
+            client.post('/api/auth/login', json={'username': 'coach', 'password': 'secret'}).status_code
+            for _ in range(LOGINS_PER_THREAD)
+        ]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        statuses = [status for batch in executor.map(login_many, range(THREADS)) for status in batch]
+
+    assert statuses == [200] * (THREADS * LOGINS_PER_THREAD)
+    assert _stored_user(database_url).login_attempt == THREADS * LOGINS_PER_THREAD
+
+def test_concurrent_wrong_passwords_are_counted(app, database_url):
+    _register(app.test_client())
+
+    def wrong_login(_):
+        return app.test_client().post('/api/auth/login', json={'username': 'coach', 'password': 'wrong'}).status_code
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        statuses = list(executor.map(wrong_login, range(THREADS)))
+
+    assert all(status != 200 for status in statuses)
+    assert _stored_user(database_url).wrong_login_attempt == THREADS
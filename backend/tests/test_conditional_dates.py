@@ -0,0 +1,41 @@
+# backend/tests/test_conditional_dates.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from models.football_team import FootballTeam
+from models.footballer import Footballer
+from models.league import League
+
+@pytest.fixture
+def headers(app, database_url):
+    with Session(create_engine(database_url)) as session:
+        session.add(League('L1', 'League'))
+        session.flush()
+        session.add(FootballTeam('League', 'L1', 'Team A'))
+        session.flush()
+        session.add(Footballer('L1', 1, 'P1', 'Team A'))
+        session.commit()
+
+    client = app.test_client()
+    client.post('/api/auth/register', json={
+        'username': 'coach', 'email': 'coach@example.com', 'password': 'secret', 'role': 'coach', 'team_id': 1
+    })
+    token = client.post('/api/auth/login', json={'username': 'coach', 'password': 'secret'}).json['user']['token']
+    return {'Authorization': f'Bearer {token}'}
+
+BAD_DATES = {'start_date': '2026-13-45', 'end_date': 'yesterday'}
+
+def test_malformed_dates_are_a_bad_request(app, headers):
+    client = app.test_client()
+    body = dict(BAD_DATES, footballer_id=1, graph_type='VO2 Max Trend with Regression')
+    responses = [
+        client.get('/api/conditional/conditional-data/1', query_string=BAD_DATES, headers=headers),
+        client.post('/api/conditional/conditional-data', json=body, headers=headers),
+        client.post('/api/conditional/generate-graph', json=body, headers=headers),
+        client.post('/api/conditional/generate-dashboard', json=body, headers=headers),
+    ]
+
+    for response in responses:
+        assert response.status_code == 400, response.json
+        assert 'YYYY-MM-DD' in response.json['error']
@@ -0,0 +1,41 @@
+# backend/tests/test_physical_targets.py
+import pytest
+
+from services.graph_series import build_series, physical_targets
+
+PROGRESS_GRAPHS = ("Physical Progress Tracker", "Training Progress Time Tracker")
+
+def _rows(muscle_mass):
+    return [
+        {
+            'id': index, 'footballer_id': 1, 'created_at': f'2026-01-0{index + 1}',
+            'muscle_mass': value, 'muscle_strength': 50.0 + index,
+            'muscle_endurance': 30.0, 'flexibility': 20.0,
+        }
+        for index, value in enumerate(muscle_mass)
+    ]
+
+def test_targets_have_a_floor_and_skip_missing_values():
+    targets = physical_targets({'zero': [0.0, 0.0], 'missing': [None, None], 'mixed': [None, 40.0], 'empty': []})
+    assert targets == {'zero': 1, 'missing': 1, 'mixed': 44, 'empty': 1}
+
+@pytest.mark.parametrize('graph_type', PROGRESS_GRAPHS)
+@pytest.mark.parametrize('muscle_mass', [[0.0, 0.0, 0.0], [None, 0.0, None]])
+def test_progress_series_with_an_all_zero_metric(graph_type, muscle_mass):
+    series = build_series('physical', graph_type, _rows(muscle_mass))
+
+    if graph_type == "Physical Progress Tracker":
+        card = next(card for card in series['metrics'] if card['metric'] == "Muscle Mass (kg)")
+        assert card['target'] == 1
+        assert card['percentage'] == 0.0
+    else:
+        assert series['targets']["Muscle Mass (kg)"] == 1
+        assert series['series']["Muscle Mass (kg)"] == [None if value is None else 0.0 for value in muscle_mass]
+
+@pytest.mark.parametrize('graph_type', PROGRESS_GRAPHS)
+def test_progress_charts_render_with_an_all_zero_metric(graph_type):
+    pytest.importorskip('matplotlib')
+    pytest.importorskip('seaborn')
+    from services.graph_renderer import render_image
+
+    assert render_image('physical', graph_type, _rows([0.0, None, 0.0])).startswith(b'\x89PNG')
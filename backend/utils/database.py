@@ -1,23 +1,130 @@
-# backend/utils/database.py
+from flask import g
 from sqlalchemy import create_engine
+from datetime import datetime
 from sqlalchemy.orm import sessionmaker
 from models.user import Base
 from dotenv import load_dotenv
 import os
+import threading
 
 load_dotenv()
 
+# Process-wide engine registry: DATABASE_URL -> (engine, sessionmaker)
+_engines = {}
+_engines_lock = threading.Lock()
+
+def _env_flag(name, default):
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def pool_options(url):
+    """Connection pool settings for url, tunable through the environment."""
+    options = {
+        'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', 'true'),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    }
+    # SQLite (local development/tests) does not use a bounded QueuePool
+    if not url.startswith('sqlite'):
+        options.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        })
+    return options
+
+def _get_registered(url=None):
+    url = url or os.getenv('DATABASE_URL')
+    entry = _engines.get(url)
+    if entry is None:
+        with _engines_lock:
+            entry = _engines.get(url)
+            if entry is None:
+                # No DDL here: the schema is created by create_tables() at deploy time
+                engine = create_engine(url, **pool_options(url))
+                entry = (engine, sessionmaker(bind=engine))
+                _engines[url] = entry
+    return entry
+
+def get_engine(url=None):
+    """Return the shared engine for url (defaults to DATABASE_URL)."""
+    return _get_registered(url)[0]
+
+def create_tables(url=None):
+    """Create every table that does not exist yet (schema bootstrap step)."""
+    # Import all models so their tables are registered on Base.metadata
+    import models.league, models.football_team, models.footballer, models.notification  # noqa: F401
+    import models.physical, models.conditional, models.endurance  # noqa: F401
+    Base.metadata.create_all(get_engine(url))
+
+def entry_date_default(context):
+    """Column default for entry_date: the calendar day of the row's created_at."""
+    created_at = context.get_current_parameters().get('created_at')
+    return (created_at or datetime.utcnow()).date()
+
+def upsert_rows(session, model, rows, conflict_columns, update_columns=None):
+    """Insert rows with a single INSERT ... ON CONFLICT statement.
+
+    Conflicting rows are updated with update_columns, or skipped when
+    update_columns is empty. Returns the ids of the inserted/updated rows.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'Upsert is not supported for {dialect}')
+
+    stmt = insert(model).values(rows)
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    return session.execute(stmt.returning(model.id)).scalars().all()
+
 class Database:
-    def __init__(self):
+    def __init__(self, url=None):
+        self.url = url
         self.engine = None
         self.Session = None
 
     def connect(self):
         if self.engine is None:
-            self.engine = create_engine(os.getenv('DATABASE_URL'))  # DATABASE_URL .env dosyasından alınacak
-            Base.metadata.create_all(self.engine)
-            self.Session = sessionmaker(bind=self.engine)
+            # Engines are shared by every Database instance in the process
+            self.engine, self.Session = _get_registered(self.url)
         return self.Session()
 
     def close(self, session):
-        session.close()
\ No newline at end of file
+        session.close()
+
+def get_session():
+    """Return the session bound to the current request, opening it on first use.
+
+    Authorization decorators, controllers and services share this session, so a
+    request checks out at most one pooled connection.
+    """
+    if 'db_session' not in g:
+        g.db_session = Database().connect()
+    return g.db_session
+
+def close_session(exception=None):
+    """Roll back whatever was left uncommitted and release the request session.
+
+    Services commit their own successful writes; views catch their errors and
+    return 4xx/5xx, so changes still pending here belong to a failed request.
+    """
+    session = g.pop('db_session', None)
+    if session is None:
+        return
+    try:
+        session.rollback()
+    except Exception as e:
+        print(f"Error finalizing request session: {str(e)}")
+    finally:
+        session.close()
+
+def init_app(app):
+    """Register the request session teardown on the Flask app."""
+    app.teardown_appcontext(close_session)
@@ -0,0 +1,58 @@
+# backend/utils/json_provider.py
+"""Optional orjson-backed JSON provider for the Flask app (FAST_JSON=true).
+
+Data-range and history responses are arrays of thousands of flat dicts and
+the stdlib encoder dominates their response time. With FAST_JSON enabled
+they are encoded by orjson straight to bytes instead. The payload stays
+the same as Flask's default provider: keys sorted, compact separators,
+datetimes/dates as HTTP dates (conditional data returns raw datetimes).
+Non-ASCII text is sent as UTF-8 rather than \\u escapes.
+"""
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson for dumps/loads/response."""
+
+    # Datetimes go through DefaultJSONProvider.default (HTTP date) like before
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        # indent / custom separators etc. are left to the stdlib encoder
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Debug'da okunaklı (indent'li) çıktı için varsayılan yol
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.options | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def init_app(app, enabled=None):
+    """Install OrjsonProvider on the app if enabled and orjson is installed.
+
+    enabled defaults to the FAST_JSON env var (read here, after load_dotenv).
+    """
+    if enabled is None:
+        enabled = os.getenv('FAST_JSON', 'false').lower() in ('1', 'true', 'yes')
+    if not enabled:
+        return
+    if orjson is None:
+        print("FAST_JSON is set but orjson is not installed; using the default JSON provider")
+        return
+    app.json = OrjsonProvider(app)
@@ -0,0 +1,58 @@
+# backend/utils/pagination.py
+"""Keyset (cursor) pagination on (created_at, id).
+
+A page is fetched with WHERE (created_at, id) > (last created_at, last id)
+instead of OFFSET, so every page costs the same no matter how deep it is.
+Cursors are opaque to clients: base64 of the last row's key.
+"""
+from datetime import datetime
+import base64
+import os
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+MAX_PAGE_SIZE = int(os.getenv('PAGE_SIZE_MAX', 200))
+
+def encode_cursor(created_at, entry_id):
+    raw = f"{created_at.isoformat()}|{entry_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, entry_id = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def page_size_arg(page_size):
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE (DEFAULT_PAGE_SIZE if missing)."""
+    if not page_size:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+def keyset_page(session, query, model, page_size, cursor=None, descending=False):
+    """Apply keyset pagination to a select() on model's columns and run it.
+
+    The selected columns must include id and created_at. Returns
+    (rows, next_cursor); next_cursor is None on the last page.
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor))
+        query = query.where(key < after if descending else key > after)
+
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at, model.id)
+
+    # Bir fazla satır çekilir: sonraki sayfa olup olmadığını anlamak için
+    rows = session.execute(query.limit(page_size + 1)).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,59 @@
+# backend/utils/serialization.py
+"""Precompiled row -> dict serializers for metric read queries.
+
+row_serializer() generates, once per column list, a function that unpacks a
+result row and builds the dict in a single literal, e.g.
+
+    def serialize(row):
+        v0, v1, v2 = row
+        return {'id': v0, 'weight': v1, 'created_at': c2(v2)}
+
+so rows are not copied through ._mapping and there is no per-field branching.
+Column lists come partly from the client (fields=), so only the most recently
+used SERIALIZER_CACHE_SIZE functions are kept.
+"""
+from datetime import datetime
+from functools import lru_cache
+
+SERIALIZER_CACHE_SIZE = 256
+
+def date_string(value):
+    """created_at as YYYY-MM-DD (today if missing)."""
+    return value.strftime('%Y-%m-%d') if value else datetime.now().strftime('%Y-%m-%d')
+
+def float_or_zero(value):
+    return float(value) if value is not None else 0.0
+
+def datetime_or_now(value):
+    return value if value else datetime.now()
+
+@lru_cache(maxsize=SERIALIZER_CACHE_SIZE)
+def row_serializer(columns, **converters):
+    """Return a function turning a row of the given columns into a dict.
+
+    columns is a tuple of names in row order; keyword arguments map a
+    column name to a converter applied to its value.
+    """
+    names = {}
+    variables = []
+    items = []
+    for index, column in enumerate(columns):
+        variables.append(f'v{index}')
+        if column in converters:
+            names[f'c{index}'] = converters[column]
+            items.append(f'{column!r}: c{index}(v{index})')
+        else:
+            items.append(f'{column!r}: v{index}')
+
+    # Tek kolonda da tuple açılımı olsun diye sondaki virgül
+    source = (
+        'def serialize(row):\n'
+        f"    {', '.join(variables)}, = row\n"
+        f"    return {{{', '.join(items)}}}\n"
+    )
+    exec(source, names)
+    return names['serialize']
+
+def serialize_rows(rows, columns, **converters):
+    """Serialize result rows whose columns are named by columns."""
+    return list(map(row_serializer(tuple(columns), **converters), rows))